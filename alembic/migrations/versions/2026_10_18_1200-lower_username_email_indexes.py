@@ -0,0 +1,101 @@
+"""lower username email indexes
+
+Revision ID: 5b2e9c41d7a3
+Revises: 87407974f44c
+Create Date: 2026-10-18 12:00:00.000000
+
+Уникальные функциональные индексы lower(username), lower(email) для регистронезависимого поиска и уникальности.
+Индексы строятся CONCURRENTLY (без блокировки записи), вне транзакции миграции.
+
+Перед построением миграция проверяет, нет ли username или email, отличающихся только регистром: с ними
+CREATE UNIQUE INDEX CONCURRENTLY упал бы на середине и оставил индекс INVALID. При дубликатах миграция
+останавливается до построения и выводит примеры. Их нужно устранить (переименовать или удалить лишние записи),
+найти все можно запросом:
+
+    SELECT lower(username), array_agg(id ORDER BY created) FROM custom_users
+    GROUP BY lower(username) HAVING count(*) > 1;
+
+(то же для email), затем повторить миграцию. INVALID индекс, оставшийся от прерванной попытки (например, дубликат
+появился во время построения), удаляется перед повторным построением.
+"""
+
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b2e9c41d7a3"
+down_revision: Union[str, None] = "87407974f44c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = {"ix_custom_users_username_lower": "username", "ix_custom_users_email_lower": "email"}
+
+
+def _check_case_duplicates(column: str) -> None:
+    """ Ошибка до построения индекса, если есть значения column, отличающиеся только регистром """
+    duplicates = op.get_bind().execute(sa.text(
+        f"SELECT lower({column}) AS value, count(*) AS n FROM custom_users "
+        f"GROUP BY lower({column}) HAVING count(*) > 1 ORDER BY n DESC, value LIMIT 10"
+    )).all()
+    if duplicates:
+        examples = ", ".join(f"{row.value} ({row.n})" for row in duplicates)
+        raise RuntimeError(
+            f"custom_users.{column}: значения, отличающиеся только регистром: {examples}. Устраните дубликаты "
+            f"(см. описание миграции {revision}) и повторите миграцию"
+        )
+
+
+def _drop_invalid_index(name: str) -> None:
+    """ INVALID индекс от прерванного CREATE INDEX CONCURRENTLY: с if_not_exists он остался бы как есть """
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        op.drop_index(name, table_name="custom_users", postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    if not context.is_offline_mode():
+        for column in INDEXES.values():
+            _check_case_duplicates(column)
+
+    with op.get_context().autocommit_block():
+        if not context.is_offline_mode():
+            for name in INDEXES:
+                _drop_invalid_index(name)
+        op.create_index(
+            "ix_custom_users_username_lower",
+            "custom_users",
+            [sa.text("lower(username)")],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_custom_users_email_lower",
+            "custom_users",
+            [sa.text("lower(email)")],
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_custom_users_email_lower",
+            table_name="custom_users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_custom_users_username_lower",
+            table_name="custom_users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""custom_users created id index
+
+Revision ID: 9d4a7f0c2e61
+Revises: 5b2e9c41d7a3
+Create Date: 2026-10-18 13:00:00.000000
+
+Индекс (created, id) для постраничного вывода пользователей по ключу. Строится CONCURRENTLY, вне транзакции
+миграции.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4a7f0c2e61"
+down_revision: Union[str, None] = "5b2e9c41d7a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_custom_users_created_id",
+            "custom_users",
+            ["created", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_custom_users_created_id",
+            table_name="custom_users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""custom_users updated id index
+
+Revision ID: 3c8e1f5a9b27
+Revises: 9d4a7f0c2e61
+Create Date: 2026-10-18 14:00:00.000000
+
+Индекс (updated, id) для инкрементальной выгрузки пользователей (export-users --since): без него каждый запуск -
+полный просмотр таблицы и сортировка. Строится CONCURRENTLY, вне транзакции миграции.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8e1f5a9b27"
+down_revision: Union[str, None] = "9d4a7f0c2e61"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_custom_users_updated_id",
+            "custom_users",
+            ["updated", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_custom_users_updated_id",
+            table_name="custom_users",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
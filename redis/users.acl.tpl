@@ -1,6 +1,6 @@
 user default off
 
-user application on >{{APPLICATION_PASSWORD}} ~cache:* ~auth:refresh:* ~queue:* +@all -@dangerous +flushall +flushdb
+user application on >{{APPLICATION_PASSWORD}} ~cache:* ~auth:refresh:* ~auth:revoked:* ~auth:throttle:* ~auth:principal:* ~auth:token_version:* ~auth:replica_sticky:* ~queue:* +@all -@dangerous +flushall +flushdb
 
 user admin on >{{ADMIN_PASSWORD}} ~* +@all
 
@@ -1,5 +1,8 @@
 from src.auth_app.api.api_router import router
 from src.auth_app.api.api_superuser import get_all_users
+from src.auth_app.api.api_introspection import introspect_tokens
+from src.auth_app.api.api_jwks import get_jwks
+from src.auth_app.api.api_service import get_service_metrics
 from src.auth_app.api.api_user_actions import delete_user, get_user_data, update_user_data
 from src.auth_app.api.api_user_login import login_user
 from src.auth_app.api.api_user_registration import register_user, change_password
@@ -7,6 +10,6 @@ from src.auth_app.api.api_user_registration import register_user, change_passwor
 
 __all__ = [
     "router", "register_user", "change_password", "delete_user", "get_user_data", "update_user_data", "login_user",
-    "get_all_users",
+    "get_all_users", "introspect_tokens", "get_jwks", "get_service_metrics",
 ]
 
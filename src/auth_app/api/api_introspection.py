@@ -0,0 +1,30 @@
+from fastapi import Request, Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_async_db
+from src.auth_app.api import router
+from src.auth_app.schemes.auth_schemes import IntrospectSchema, IntrospectResponseSchema
+from src.auth_app.services.auth import authenticate, available_staff
+from src.auth_app.services.introspection import IntrospectionService
+
+
+@router.post(
+    path="/introspect",
+    status_code=status.HTTP_200_OK,
+    response_model=IntrospectResponseSchema,
+    dependencies=[Depends(authenticate), Depends(available_staff)]
+)
+async def introspect_tokens(
+        request: Request, body: IntrospectSchema, db: AsyncSession = Depends(get_async_db, scope="function")
+) -> IntrospectResponseSchema:
+    """
+    Проверка пачки access токенов для других сервисов. Для каждого токена вернет active и claims.
+    Args:
+        request: Request
+        body: tokens
+        db: session
+    Returns:
+        results in the order of tokens
+    """
+    response = await IntrospectionService(request.app.state.redis_client, db).introspect(body.tokens)
+    return response
@@ -0,0 +1,20 @@
+from fastapi import Request, Response, status
+
+from src.auth_app.api import router
+from src.auth_app.services.jwks import jwks_document
+
+
+@router.get(path="/.well-known/jwks.json", status_code=status.HTTP_200_OK)
+async def get_jwks(request: Request) -> Response:
+    """
+    Публичные ключи проверки подписи токенов в формате JWK. Поддерживает ETag / If-None-Match.
+    Returns:
+        {"keys": [...]} or 304 Not Modified
+    """
+    body, etag = jwks_document.get()
+    headers = {"ETag": etag, "Cache-Control": jwks_document.cache_control}
+
+    if jwks_document.is_not_modified(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type="application/json", headers=headers)
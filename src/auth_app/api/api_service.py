@@ -0,0 +1,27 @@
+from fastapi import Depends, status
+
+from src.core.crypto_executor import crypto_executor
+from src.core.database import pool_stats
+from src.core.redis.principal_cache import principal_cache
+from src.auth_app.api import router
+from src.auth_app.services.auth import authenticate, available_admin, crypto_admission_controller
+from src.auth_app.services.token_cache import access_token_cache
+
+
+@router.get(
+    path="/service/metrics",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(authenticate), Depends(available_admin)]
+)
+async def get_service_metrics() -> dict:
+    """
+    Метрики воркера: пул соединений БД, пул хеширования, допуск к апи с хешированием, кэши токенов и
+    пользователей.
+    """
+    return {
+        "db_pool": pool_stats(),
+        "crypto_executor": crypto_executor.stats(),
+        "crypto_admission": crypto_admission_controller.stats(),
+        "access_token_cache": access_token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+    }
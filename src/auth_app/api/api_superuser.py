@@ -1,12 +1,17 @@
-from fastapi import Depends, status
+from fastapi import Depends, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_async_db
 from src.auth_app.api import router
 from src.auth_app.exceptions import UserHTTPException
 from src.auth_app.repositories.superuser_repository import SuperuserRepo
-from src.auth_app.schemes.user_schemes import UserWorkSchema, UsersAllSchema, UserServiceFieldsSchema
+from src.auth_app.schemes.user_schemes import (
+    UsersAllSchema, UserServiceFieldsSchema, UserServiceFieldsBulkSchema, UserServiceFieldsBulkResponseSchema
+)
+from src.auth_app.services.admin_actions import ServiceFieldsBulkService
 from src.auth_app.services.auth import authenticate, available_admin
+from src.auth_app.services.user_listing import UserListingService
 
 
 @router.get(
@@ -15,12 +20,20 @@ from src.auth_app.services.auth import authenticate, available_admin
     response_model=UsersAllSchema,
     dependencies=[Depends(authenticate), Depends(available_admin)]
 )
-async def get_all_users(limit: int = 10, db: AsyncSession = Depends(get_async_db)) -> UsersAllSchema:
+async def get_all_users(
+        limit: int = Query(default=10, ge=1, le=1000),
+        cursor: str | None = Query(default=None, description="next_cursor предыдущей страницы"),
+        stream: bool = Query(default=False, description="Все пользователи после cursor потоком NDJSON"),
+        db: AsyncSession = Depends(get_async_db, scope="function"),
+):
     """
-    Отдаёт данные о всех зарегистрированных пользователях
+    Отдаёт данные о зарегистрированных пользователях постранично (по ключу created, id). С stream=true - всех
+    пользователей после cursor в формате NDJSON, по мере чтения курсором на сервере БД.
     """
-    users = await SuperuserRepo.select_users(db)
-    response = UsersAllSchema(users=[UserWorkSchema.model_validate(user) for user in users])
+    if stream:
+        return StreamingResponse(UserListingService.stream_ndjson(cursor), media_type="application/x-ndjson")
+
+    response: UsersAllSchema = await UserListingService(db).get_page(limit, cursor)
     return response
 
 
@@ -29,7 +42,9 @@ async def get_all_users(limit: int = 10, db: AsyncSession = Depends(get_async_db
     status_code=status.HTTP_200_OK,
     dependencies=[Depends(authenticate), Depends(available_admin)]
 )
-async def set_service_fields_user(body: UserServiceFieldsSchema, db: AsyncSession = Depends(get_async_db)):
+async def set_service_fields_user(
+        body: UserServiceFieldsSchema, db: AsyncSession = Depends(get_async_db, scope="function")
+):
     """
     Изменение администратором сервисных полей пользователя.
     """
@@ -42,3 +57,20 @@ async def set_service_fields_user(body: UserServiceFieldsSchema, db: AsyncSessio
 
     data_returning = await SuperuserRepo.update_user_by_admin(username, data, db)
     return data_returning
+
+
+@router.post(
+    path="/set_service_fields_users",
+    status_code=status.HTTP_200_OK,
+    response_model=UserServiceFieldsBulkResponseSchema,
+    dependencies=[Depends(authenticate), Depends(available_admin)]
+)
+async def set_service_fields_users(
+        body: UserServiceFieldsBulkSchema, db: AsyncSession = Depends(get_async_db, scope="function")
+) -> UserServiceFieldsBulkResponseSchema:
+    """
+    Изменение администратором сервисных полей пачки пользователей (по id или username) одним запросом в одной
+    транзакции. Результат - по каждому пользователю в порядке запроса.
+    """
+    response = await ServiceFieldsBulkService(db).update_service_fields(body)
+    return response
@@ -3,7 +3,6 @@ from uuid import UUID
 
 from fastapi import Request, Depends, status
 
-from src.core.database import get_async_db
 from src.auth_app.api import router
 from src.auth_app.exceptions import AuthHTTPException
 from src.auth_app.schemes.user_schemes import UserWorkSchema, UserUpdateSchema
@@ -17,7 +16,7 @@ if TYPE_CHECKING:
 @router.delete(
     path="/remove_user/{user_id}",
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(authenticate), Depends(get_async_db)]
+    dependencies=[Depends(authenticate)]
 )
 async def delete_user(request: Request, user_id: UUID):
     """
@@ -41,7 +40,7 @@ async def delete_user(request: Request, user_id: UUID):
     path="/user_info/{user_id}",
     response_model=UserWorkSchema,
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(authenticate), Depends(get_async_db)]
+    dependencies=[Depends(authenticate)]
 )
 async def get_user_data(request: Request, user_id: UUID):
     """
@@ -64,7 +63,7 @@ async def get_user_data(request: Request, user_id: UUID):
     path="/update_user/{user_id}",
     response_model=UserWorkSchema,
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(authenticate), Depends(get_async_db)]
+    dependencies=[Depends(authenticate)]
 )
 async def update_user_data(request: Request, user_data: UserUpdateSchema, user_id: UUID):
     """
@@ -3,13 +3,22 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.core.database import get_async_db
 from src.auth_app.api import router
-from src.auth_app.services.auth import refresh_tokens, authenticate
+from src.auth_app.services.auth import refresh_tokens, authenticate, crypto_admission, check_login_throttle
 from src.auth_app.schemes.auth_schemes import AuthSchema
 from src.auth_app.services.user_actions import AuthUserActions
 
 
-@router.post(path="/login", status_code=status.HTTP_200_OK)
-async def login_user(request: Request, response: Response, user: AuthSchema, db: AsyncSession = Depends(get_async_db)):
+@router.post(
+    path="/login",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(check_login_throttle), Depends(crypto_admission)]
+)
+async def login_user(
+        request: Request,
+        response: Response,
+        user: AuthSchema,
+        db: AsyncSession = Depends(get_async_db, scope="function"),
+):
     """
     Аутентификация. Устанавливает заголовки "access_token" и "refresh_token" в ответе. Если пользователь не пройдет
     проверку будет вызвано исключение: HTTPException, status.HTTP_401_UNAUTHORIZED.
@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.core.database import get_async_db
 from src.auth_app.api import router
 from src.auth_app.schemes.user_schemes import UserRegisterSchema, ChangePasswordSchema
-from src.auth_app.services.auth import authenticate
+from src.auth_app.services.auth import authenticate, crypto_admission
 from src.auth_app.services.password import ChangePasswordService
 from src.auth_app.services.registration import RegistrationService
 from src.auth_app.exceptions import AuthHTTPException
@@ -16,8 +16,8 @@ if TYPE_CHECKING:
     from src.auth_app.services.user import CurrentUser
 
 
-@router.post(path="/register", status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserRegisterSchema, db: AsyncSession = Depends(get_async_db)):
+@router.post(path="/register", status_code=status.HTTP_201_CREATED, dependencies=[Depends(crypto_admission)])
+async def register_user(user: UserRegisterSchema, db: AsyncSession = Depends(get_async_db, scope="function")):
     """
     Регистрация пользователя в системе. Если пользователь уже существует, то будет поднято исключение.
     Args:
@@ -33,10 +33,13 @@ async def register_user(user: UserRegisterSchema, db: AsyncSession = Depends(get
 @router.post(
     path="/change-password/{user_id}",
     status_code=status.HTTP_200_OK,
-    dependencies=[Depends(authenticate)]
+    dependencies=[Depends(authenticate), Depends(crypto_admission)]
 )
 async def change_password(
-        request: Request, user_id: UUID, password: ChangePasswordSchema, db: AsyncSession = Depends(get_async_db)
+        request: Request,
+        user_id: UUID,
+        password: ChangePasswordSchema,
+        db: AsyncSession = Depends(get_async_db, scope="function"),
 ):
     """
     Смена пароля пользователя.
@@ -0,0 +1,53 @@
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+
+from src.auth_app.models import CustomUser
+from src.auth_app.repositories.base_repository import USER_FIELDS
+from src.auth_app.repositories.user_repository import SELECT_USER_BY_ID
+
+
+@dataclass
+class StatementTiming:
+    name: str
+    per_call_us: float
+
+
+def _per_call_us(func: Callable, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return round((time.perf_counter() - start) / iterations * 1_000_000, 3)
+
+
+def benchmark_statements(iterations: int) -> list[StatementTiming]:
+    """
+    Затраты SQLAlchemy на подготовку запроса read_one_user_by_id до обращения к БД, на один вызов:
+    сборка select с ключом кэша компиляции на каждый вызов (как было), ключ кэша готового statement (как стало)
+    и компиляция без кэша - ее стоимость при промахе кэша.
+    Args:
+        iterations: число повторов каждого замера
+    Returns:
+        время на вызов, мкс
+    """
+    user_id = uuid.uuid4()
+    dialect = PGDialect_asyncpg()
+
+    def build_per_call():
+        return select(*USER_FIELDS).where(CustomUser.id == user_id)._generate_cache_key()
+
+    def prebuilt():
+        return SELECT_USER_BY_ID._generate_cache_key()
+
+    def compile_uncached():
+        return SELECT_USER_BY_ID.compile(dialect=dialect)
+
+    return [
+        StatementTiming("select на каждый вызов + ключ кэша", _per_call_us(build_per_call, iterations)),
+        StatementTiming("готовый statement + ключ кэша", _per_call_us(prebuilt, iterations)),
+        StatementTiming("компиляция без кэша", _per_call_us(compile_uncached, max(1, iterations // 10))),
+    ]
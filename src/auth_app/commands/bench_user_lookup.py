@@ -0,0 +1,65 @@
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass
+from uuid import UUID
+
+from src.core.database import AsyncSessionLocal, async_engine
+from src.auth_app.repositories.fast_repository import AsyncpgUserRegisteredRepo
+from src.auth_app.repositories.user_repository import UserRegisteredRepo
+from src.auth_app.schemes.user_schemes import UserWorkSchema
+
+
+@dataclass
+class LookupTiming:
+    name: str
+    rps: float
+    p50_ms: float
+    p95_ms: float
+
+
+async def _run_path(repo: type[UserRegisteredRepo], user_id: UUID, requests: int, concurrency: int) -> LookupTiming:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: list[float] = []
+
+    async def lookup() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            async with AsyncSessionLocal() as session:
+                user_map = await repo.read_one_user_by_id(user_id, session)
+                UserWorkSchema(**user_map)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(lookup() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(timings, n=20, method="inclusive")
+    return LookupTiming(
+        name=repo.__name__,
+        rps=round(requests / elapsed, 1),
+        p50_ms=round(statistics.median(timings), 3),
+        p95_ms=round(quantiles[18], 3),
+    )
+
+
+async def benchmark_user_lookup(user_id: UUID, requests: int, concurrency: int) -> list[LookupTiming]:
+    """
+    Сравнение read_one_user_by_id через AsyncSession (UserRegisteredRepo) и напрямую через asyncpg
+    (AsyncpgUserRegisteredRepo) под конкурентной нагрузкой, на настроенной БД. Каждый путь прогревается
+    до замера (соединения пула, prepared statements).
+    Args:
+        user_id: id существующего пользователя
+        requests: число запросов на путь
+        concurrency: число одновременных запросов
+    Returns:
+        пропускная способность и задержки по каждому пути
+    """
+    results = []
+    try:
+        for repo in (UserRegisteredRepo, AsyncpgUserRegisteredRepo):
+            await _run_path(repo, user_id, concurrency * 2, concurrency)
+            results.append(await _run_path(repo, user_id, requests, concurrency))
+    finally:
+        await async_engine.dispose()
+    return results
@@ -0,0 +1,95 @@
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from argon2 import PasswordHasher
+
+from src.core.config import BASE_DIR
+
+
+TIME_COSTS: tuple[int, ...] = (1, 2, 3, 4, 6, 8)
+MEMORY_COSTS_KIB: tuple[int, ...] = (19456, 32768, 47104, 65536, 131072, 262144)
+BENCH_PASSWORD: str = "Calibrate-Argon2-Password1!"
+
+
+@dataclass
+class Argon2Candidate:
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+    p95_ms: float
+
+    @property
+    def cost(self) -> int:
+        return self.time_cost * self.memory_cost
+
+    def as_env(self) -> dict[str, str]:
+        return {
+            "ARGON2_TIME_COST": str(self.time_cost),
+            "ARGON2_MEMORY_COST": str(self.memory_cost),
+            "ARGON2_PARALLELISM": str(self.parallelism),
+        }
+
+
+def _p95_ms(hasher: PasswordHasher, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hasher.hash(BENCH_PASSWORD)
+        timings.append((time.perf_counter() - start) * 1000)
+    if len(timings) < 2:
+        return timings[0]
+    return statistics.quantiles(timings, n=20, method="inclusive")[18]
+
+
+def benchmark_argon2(target_ms: float, max_memory_mib: int, samples: int) -> list[Argon2Candidate]:
+    """
+    Замер Argon2 на текущем хосте по сетке time_cost, memory_cost, parallelism. Для каждой пары
+    (memory_cost, parallelism) time_cost увеличивается, пока p95 укладывается в target_ms.
+    Args:
+        target_ms: целевое p95 время хеширования, мс
+        max_memory_mib: потолок памяти на один хеш, MiB
+        samples: число замеров на точку сетки
+    Returns:
+        все замеренные точки
+    """
+    cpu = os.cpu_count() or 1
+    parallelisms = sorted({p for p in (1, 2, 4, cpu) if p <= cpu})
+    memory_costs = [m for m in MEMORY_COSTS_KIB if m <= max_memory_mib * 1024]
+
+    measured = []
+    for memory_cost in memory_costs:
+        for parallelism in parallelisms:
+            for time_cost in TIME_COSTS:
+                hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+                p95 = _p95_ms(hasher, samples)
+                measured.append(Argon2Candidate(time_cost, memory_cost, parallelism, round(p95, 2)))
+                if p95 > target_ms:
+                    break
+    return measured
+
+
+def recommend_argon2(measured: list[Argon2Candidate], target_ms: float) -> Argon2Candidate | None:
+    """ Самые стойкие параметры (time_cost * memory_cost), укладывающиеся в target_ms """
+    fitting = [c for c in measured if c.p95_ms <= target_ms]
+    if not fitting:
+        return None
+    return max(fitting, key=lambda c: (c.cost, -c.parallelism, -c.p95_ms))
+
+
+def write_env(values: dict[str, str], env_file: Path | None = None) -> Path:
+    """ Записывает/заменяет переменные в .env """
+    path = env_file or BASE_DIR / ".env"
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+
+    rest = dict(values)
+    for i, line in enumerate(lines):
+        name = line.split("=", 1)[0].strip()
+        if name in rest:
+            lines[i] = f"{name}={rest.pop(name)}"
+    lines.extend(f"{name}={value}" for name, value in rest.items())
+
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
@@ -1,4 +1,7 @@
-from src.core.database import AsyncSessionLocal
+from sqlalchemy.exc import DataError, IntegrityError
+
+from src.core.database import AsyncSessionLocal, unit_of_work
+from src.core.logger import logger
 from src.auth_app.repositories.superuser_repository import SuperuserRepo
 from src.auth_app.services.password import password
 
@@ -13,29 +16,25 @@ async def create_superuser(username: str, email: str, pwd: str) -> str:
     Return:
         Massage: str
     """
-    pwd_hash = password.hashing_password(pwd)
+    pwd_hash = await password.hashing_password(pwd)
 
     async with AsyncSessionLocal() as session:
         try:
-            exists = await SuperuserRepo.is_unique_user(
-                username=username,
-                email=email,
-                db=session
-            )
-            if not exists:
+            async with unit_of_work(session):
                 result: bool = await SuperuserRepo.create_superuser(
                     username=username,
                     email=email,
                     password=pwd_hash,
                     db=session
                 )
+        except (IntegrityError, DataError) as exp:
+            # нарушение ограничений столбцов (NOT NULL, длина), транзакция уже откатана
+            logger.error("Ошибка записи в БД при создании суперпользователя: {err}", err=exp)
+            return f"Суперпользователя {username}, {email} создать не удалось"
         finally:
             await session.close()
 
-    if exists:
-        return f"Суперпользователь c {username}, {email} уже существует!"
-
     if not result:
-        return f"Суперпользователя {username}, {email} создать не удалось"
+        return f"Суперпользователь c {username}, {email} уже существует!"
 
     return f"Суперпользователь {username}, {email} создан!"
@@ -0,0 +1,112 @@
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import Executable, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import AsyncSessionLocal, async_engine
+from src.auth_app.repositories.base_repository import (
+    EXISTS_USER_BY_USERNAME, EXISTS_USER_BY_EMAIL, EXISTS_USER_BY_USERNAME_OR_EMAIL
+)
+from src.auth_app.repositories.superuser_repository import (
+    UPDATE_USER_BY_ADMIN, SELECT_USERS_PAGE, SELECT_USERS_PAGE_AFTER
+)
+from src.auth_app.repositories.user_pwd_repository import (
+    SELECT_USER_WITH_PASSWORD_BY_USERNAME, SELECT_USER_WITH_PASSWORD_BY_EMAIL, UPDATE_USER_PASSWORD
+)
+from src.auth_app.repositories.user_repository import (
+    SELECT_USER_BY_ID, SELECT_USERS_BY_IDS, SELECT_USER_BY_USERNAME, SELECT_USER_BY_EMAIL, DELETE_USER,
+    UPDATE_USER_BY_ID
+)
+
+
+PKEY = "custom_users_pkey"
+USERNAME_INDEX = "ix_custom_users_username_lower"
+EMAIL_INDEX = "ix_custom_users_email_lower"
+CREATED_INDEX = "ix_custom_users_created_id"
+
+
+@dataclass
+class ExplainResult:
+    name: str
+    expected: set[str]
+    used: set[str]
+
+    @property
+    def ok(self) -> bool:
+        return self.expected <= self.used
+
+
+async def _explain(session: AsyncSession, statement: Executable, params: dict[str, Any]) -> dict:
+    """ План запроса: statement компилируется диалектом сеанса, EXPLAIN (FORMAT JSON) выполняется драйвером """
+
+    compiled = statement.compile(dialect=session.bind.dialect, column_keys=list(params))
+    args = tuple(params[name] for name in compiled.positiontup)
+    connection = await session.connection()
+    plan = (await connection.exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled), args)).scalar()
+    return plan[0]["Plan"]
+
+
+def _used_indexes(plan: dict) -> set[str]:
+    used = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        used |= _used_indexes(child)
+    return used
+
+
+def explain_checks() -> list[tuple[str, Executable, dict[str, Any], set[str]]]:
+    """ Запросы репозиториев пользователя: (имя, запрос, параметры, индексы, которые план должен использовать) """
+    user_id, username, email = uuid.uuid4(), "Explain_User", "Explain_User@Example.com"
+    return [
+        ("read_one_user_by_id", SELECT_USER_BY_ID, {"user_id": user_id}, {PKEY}),
+        ("read_users_by_ids", SELECT_USERS_BY_IDS, {"ids": [user_id]}, {PKEY}),
+        ("read_one_user_by_username", SELECT_USER_BY_USERNAME, {"username": username}, {USERNAME_INDEX}),
+        ("read_one_user_by_email", SELECT_USER_BY_EMAIL, {"email": email}, {EMAIL_INDEX}),
+        ("read_user_with_password (username)", SELECT_USER_WITH_PASSWORD_BY_USERNAME, {"username": username},
+         {USERNAME_INDEX}),
+        ("read_user_with_password (email)", SELECT_USER_WITH_PASSWORD_BY_EMAIL, {"email": email}, {EMAIL_INDEX}),
+        ("is_unique_user (username)", EXISTS_USER_BY_USERNAME, {"username": username}, {USERNAME_INDEX}),
+        ("is_unique_user (email)", EXISTS_USER_BY_EMAIL, {"email": email}, {EMAIL_INDEX}),
+        ("is_unique_user (username, email)", EXISTS_USER_BY_USERNAME_OR_EMAIL, {"username": username, "email": email},
+         {USERNAME_INDEX, EMAIL_INDEX}),
+        ("delete_user", DELETE_USER, {"by_username": username, "by_email": email}, {USERNAME_INDEX}),
+        ("update_one_user_by_id", UPDATE_USER_BY_ID, {"user_id": user_id, "first_name": "Explain"}, {PKEY}),
+        ("update_user_password", UPDATE_USER_PASSWORD, {"user_id": user_id, "password": "explain"}, {PKEY}),
+        ("update_user_by_admin", UPDATE_USER_BY_ADMIN, {"by_username": username, "is_staff": False},
+         {USERNAME_INDEX}),
+        ("select_users_page", SELECT_USERS_PAGE, {"limit": 10}, {CREATED_INDEX}),
+        ("select_users_page (after)", SELECT_USERS_PAGE_AFTER,
+         {"limit": 10, "after_created": datetime.now(timezone.utc), "after_id": user_id}, {CREATED_INDEX}),
+    ]
+
+
+async def explain_in_session(session: AsyncSession) -> list[ExplainResult]:
+    """
+    EXPLAIN каждого запроса explain_checks в транзакции сеанса. Последовательное сканирование отключается
+    (SET LOCAL enable_seqscan = off), чтобы результат не зависел от размера таблицы: если индекс при этом не выбран,
+    предикат его использовать не может. Запросы не выполняются, откат транзакции - за вызывающим.
+    """
+    await session.execute(text("SET LOCAL enable_seqscan = off"))
+    results = []
+    for name, statement, params, expected in explain_checks():
+        plan = await _explain(session, statement, params)
+        results.append(ExplainResult(name, expected, _used_indexes(plan)))
+    return results
+
+
+async def explain_user_queries() -> list[ExplainResult]:
+    """
+    EXPLAIN каждого запроса репозиториев пользователя на настроенной БД и проверка, что план использует
+    ожидаемый индекс. Транзакция откатывается.
+    Returns:
+        ожидаемые и использованные индексы по каждому запросу
+    """
+    try:
+        async with AsyncSessionLocal() as session:
+            results = await explain_in_session(session)
+            await session.rollback()
+    finally:
+        await async_engine.dispose()
+    return results
@@ -0,0 +1,201 @@
+import csv
+import io
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, Literal, Sequence
+
+from sqlalchemy import Row, Select, select
+
+from src.core.database import AsyncSessionLocal, async_engine
+from src.auth_app.models import CustomUser
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Parquet - необязательная зависимость
+    pyarrow = None
+
+
+ExportFormat = Literal["csv", "parquet"]
+
+# Все столбцы custom_users, кроме password
+EXPORT_COLUMNS: dict = {
+    "id": CustomUser.id,
+    "created": CustomUser.created,
+    "updated": CustomUser.updated,
+    "username": CustomUser.username,
+    "email": CustomUser.email,
+    "first_name": CustomUser.first_name,
+    "second_name": CustomUser.second_name,
+    "last_name": CustomUser.last_name,
+    "is_active": CustomUser.is_active,
+    "is_staff": CustomUser.is_staff,
+    "is_superuser": CustomUser.is_superuser,
+}
+
+
+@dataclass
+class ExportStats:
+    rows: int = 0
+    watermark: datetime | None = None
+
+
+def parse_columns(columns: str | None) -> list[str]:
+    """ Список столбцов через запятую, None - все. ValueError для неизвестных (в том числе password) """
+    if not columns:
+        return list(EXPORT_COLUMNS)
+
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in names if name not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Неизвестные столбцы: {', '.join(unknown)}. Доступны: {', '.join(EXPORT_COLUMNS)}")
+    return names
+
+
+def parse_since(value: str | None) -> datetime | None:
+    """
+    Водяной знак в формате ISO 8601, как его выводит export-users (с микросекундами и часовым поясом).
+    Без часового пояса - UTC. ValueError для некорректного значения
+    """
+    if not value:
+        return None
+    since = datetime.fromisoformat(value)
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return since
+
+
+def build_export_query(columns: list[str], since: datetime | None, overlap: timedelta = timedelta()) -> Select:
+    """
+    Выборка столбцов columns и updated (для водяного знака). С since - только строки с updated > since - overlap,
+    в порядке индекса ix_custom_users_updated_id.
+    """
+    query = select(*(EXPORT_COLUMNS[name] for name in columns), CustomUser.updated.label("_watermark"))
+    if since is None:
+        return query.order_by(CustomUser.created, CustomUser.id)
+    return query.where(CustomUser.updated > since - overlap).order_by(CustomUser.updated, CustomUser.id)
+
+
+class CsvExportWriter:
+
+    def __init__(self, stream: BinaryIO, columns: list[str]):
+        self._text = io.TextIOWrapper(stream, encoding="utf-8", newline="", write_through=True)
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(columns)
+
+    def write(self, rows: Sequence[Sequence]) -> None:
+        self._writer.writerows(rows)
+        return
+
+    def close(self) -> None:
+        self._text.flush()
+        self._text.detach()
+        return
+
+
+class ParquetExportWriter:
+    """ Одна пачка курсора - одна группа строк Parquet """
+
+    TYPES: dict = {
+        "id": "string",
+        "created": "timestamp",
+        "updated": "timestamp",
+        "is_active": "bool",
+        "is_staff": "bool",
+        "is_superuser": "bool",
+    }
+
+    def __init__(self, stream: BinaryIO, columns: list[str]):
+        types = {
+            "string": pyarrow.string(),
+            "timestamp": pyarrow.timestamp("us", tz="UTC"),
+            "bool": pyarrow.bool_(),
+        }
+        self._columns = columns
+        self._schema = pyarrow.schema([(name, types[self.TYPES.get(name, "string")]) for name in columns])
+        self._writer = pyarrow.parquet.ParquetWriter(pyarrow.PythonFile(stream, mode="w"), self._schema)
+
+    def write(self, rows: Sequence[Sequence]) -> None:
+        arrays = []
+        for i, name in enumerate(self._columns):
+            values = [row[i] for row in rows]
+            if name == "id":
+                values = [str(value) for value in values]
+            arrays.append(pyarrow.array(values, type=self._schema.field(name).type))
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+        return
+
+    def close(self) -> None:
+        self._writer.close()
+        return
+
+
+WRITERS: dict = {"csv": CsvExportWriter, "parquet": ParquetExportWriter}
+
+
+@contextmanager
+def _open_output(path: Path | None) -> Iterator[BinaryIO]:
+    if path is None:
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+        return
+    with path.open("wb") as stream:
+        yield stream
+
+
+async def export_users(
+        path: Path | None,
+        fmt: ExportFormat,
+        columns: list[str],
+        since: datetime | None,
+        batch_size: int,
+        overlap: timedelta = timedelta(),
+) -> ExportStats:
+    """
+    Выгрузка пользователей курсором на сервере БД пачками по batch_size: в памяти только текущая пачка.
+    Столбец password не выгружается.
+
+    updated - now(), то есть время начала транзакции, а не фиксации. Транзакция, начатая до наибольшего updated
+    прошлой выгрузки и зафиксированная после нее, получает updated меньше водяного знака, и строгое
+    updated > since ее пропустит. Поэтому окно since - overlap берется с запасом не меньше самой долгой пишущей
+    транзакции: строки из окна выгружаются повторно, получатель схлопывает их по id (побеждает больший updated).
+    Args:
+        path: файл, None - stdout
+        fmt: csv или parquet
+        columns: столбцы выгрузки
+        since: водяной знак - выгрузить только строки с updated > since - overlap
+        batch_size: строк в пачке
+        overlap: перекрытие с прошлой выгрузкой
+    Returns:
+        число строк и новый водяной знак (наибольший updated среди выгруженных)
+    """
+    if fmt == "parquet" and pyarrow is None:
+        raise RuntimeError("Для формата parquet нужен пакет pyarrow")
+
+    stats = ExportStats(watermark=since)
+    query = build_export_query(columns, since, overlap)
+    try:
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query, execution_options={"yield_per": batch_size})
+            with _open_output(path) as stream:
+                writer = WRITERS[fmt](stream, columns)
+                try:
+                    async for rows in result.partitions():
+                        writer.write([row[:-1] for row in rows])
+                        stats.rows += len(rows)
+                        stats.watermark = _max_watermark(stats.watermark, rows)
+                finally:
+                    writer.close()
+    finally:
+        await async_engine.dispose()
+    return stats
+
+
+def _max_watermark(watermark: datetime | None, rows: Sequence[Row]) -> datetime | None:
+    batch_max = max(row[-1] for row in rows)
+    if watermark is None or batch_max > watermark:
+        return batch_max
+    return watermark
@@ -0,0 +1,268 @@
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, TextIO, Literal
+
+from pydantic import ValidationError
+
+from src.core.database import async_engine
+from src.auth_app.models import CustomUser
+from src.auth_app.schemes.user_schemes import UserRegisterSchema
+from src.auth_app.services.password import get_hasher
+
+
+ImportFormat = Literal["csv", "ndjson"]
+
+STAGING_TABLE = "import_users_staging"
+STAGING_COLUMNS = (
+    "line", "id", "username", "email", "password", "first_name", "second_name", "last_name",
+)
+
+# Длины строковых столбцов custom_users: одно более длинное значение сорвало бы COPY всей пачки, поэтому строки
+# проверяются заранее
+MAX_LENGTHS: dict[str, int] = {
+    name: CustomUser.__table__.c[name].type.length
+    for name in ("username", "email", "password", "first_name", "second_name", "last_name")
+}
+
+CREATE_STAGING_SQL = f"""
+CREATE TEMPORARY TABLE {STAGING_TABLE} (
+    line integer NOT NULL,
+    id uuid NOT NULL,
+    username varchar({MAX_LENGTHS["username"]}) NOT NULL,
+    email varchar({MAX_LENGTHS["email"]}) NOT NULL,
+    password varchar({MAX_LENGTHS["password"]}) NOT NULL,
+    first_name varchar({MAX_LENGTHS["first_name"]}),
+    second_name varchar({MAX_LENGTHS["second_name"]}),
+    last_name varchar({MAX_LENGTHS["last_name"]})
+) ON COMMIT DROP
+"""
+
+# Вставка из промежуточной таблицы. Строки, не попавшие в inserted, конфликтуют с существующими пользователями
+# (или с более ранней строкой файла) по уникальным индексам username/email.
+MERGE_SQL = f"""
+WITH inserted AS (
+    INSERT INTO custom_users (
+        id, username, email, password, first_name, second_name, last_name, is_active, is_staff, is_superuser
+    )
+    SELECT id, username, email, password, first_name, second_name, last_name, true, false, false
+    FROM {STAGING_TABLE}
+    ORDER BY line
+    ON CONFLICT DO NOTHING
+    RETURNING id
+)
+SELECT s.line, s.username, s.email
+FROM {STAGING_TABLE} s
+WHERE s.id NOT IN (SELECT id FROM inserted)
+ORDER BY s.line
+"""
+
+
+@dataclass
+class RejectedRow:
+    line: int
+    username: str | None
+    email: str | None
+    reason: str
+
+
+@dataclass
+class ImportStats:
+    total: int = 0
+    inserted: int = 0
+    rejected: list[RejectedRow] = field(default_factory=list)
+    hashing_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.total / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+
+
+def _hash_password(pwd: str) -> str:
+    """ Выполняется в процессе пула """
+    return get_hasher().hash(pwd)
+
+
+def _column_errors(values: dict) -> list[str]:
+    """ Значения, которые не поместятся в столбцы custom_users (не строка или длиннее столбца) """
+    errors = []
+    for name, value in values.items():
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            errors.append(f"{name}: ожидается строка")
+        elif len(value) > MAX_LENGTHS[name]:
+            errors.append(f"{name}: длина {len(value)} больше {MAX_LENGTHS[name]}")
+    return errors
+
+
+def detect_format(path: Path | None) -> ImportFormat:
+    if path is not None and path.suffix.lower() in (".ndjson", ".jsonl"):
+        return "ndjson"
+    return "csv"
+
+
+def read_rows(source: TextIO, fmt: ImportFormat) -> Iterator[tuple[int, dict | None]]:
+    """ Построчное чтение входа: (номер строки, данные), None - строка не разобрана """
+    if fmt == "csv":
+        reader = csv.DictReader(source)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_num, line in enumerate(source, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else None
+
+
+class UserImporter:
+    """
+    Загрузка пользователей пачками: проверка строк схемой регистрации, хеширование паролей в пуле процессов,
+    COPY пачки во временную таблицу и одна вставка из нее в custom_users с отчетом о конфликтах. Хеширование
+    следующей пачки идет параллельно с загрузкой предыдущей. Каждая пачка - отдельная транзакция.
+    """
+
+    def __init__(self, batch_size: int, workers: int):
+        self.batch_size: int = batch_size
+        self.workers: int = workers or os.cpu_count() or 1
+        self.stats = ImportStats()
+
+    def _validate(self, line: int, row: dict | None) -> dict | None:
+        """ Значения столбцов строки (пароль - открытым текстом) или None, если строка отклонена """
+
+        if row is None:
+            self.stats.rejected.append(RejectedRow(line, None, None, "invalid: not a JSON object"))
+            return None
+        try:
+            user = UserRegisterSchema(**row)
+        except (ValidationError, TypeError) as exp:
+            self.stats.rejected.append(
+                RejectedRow(line, row.get("username"), row.get("email"), f"invalid: {exp}".replace("\n", " "))
+            )
+            return None
+
+        values = {
+            "username": user.username,
+            "email": str(user.email),
+            "first_name": row.get("first_name") or None,
+            "second_name": row.get("second_name") or None,
+            "last_name": row.get("last_name") or None,
+        }
+        errors = _column_errors(values)
+        if errors:
+            self.stats.rejected.append(
+                RejectedRow(line, user.username, str(user.email), f"invalid: {'; '.join(errors)}")
+            )
+            return None
+        return {**values, "password": user.password}
+
+    async def _prepare(self, batch: list[tuple[int, dict | None]], pool: Executor) -> list[tuple]:
+        """ Проверка строк и хеширование паролей. Вернет записи для COPY """
+
+        valid: list[tuple[int, dict]] = []
+        for line, row in batch:
+            values = self._validate(line, row)
+            if values is not None:
+                valid.append((line, values))
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        hashes = await asyncio.gather(
+            *(loop.run_in_executor(pool, _hash_password, values["password"]) for _, values in valid)
+        )
+        self.stats.hashing_seconds += time.perf_counter() - start
+
+        records = []
+        for (line, values), pwd_hash in zip(valid, hashes):
+            if len(pwd_hash) > MAX_LENGTHS["password"]:
+                # параметры Argon2 дают хеш длиннее столбца password
+                self.stats.rejected.append(RejectedRow(
+                    line, values["username"], values["email"],
+                    f"invalid: password: длина хеша {len(pwd_hash)} больше {MAX_LENGTHS['password']}",
+                ))
+                continue
+            records.append((
+                line, uuid.uuid4(), values["username"], values["email"], pwd_hash,
+                values["first_name"], values["second_name"], values["last_name"],
+            ))
+        return records
+
+    async def _load(self, connection, records: list[tuple]) -> None:
+        """ COPY во временную таблицу и вставка в custom_users одной транзакцией """
+
+        if not records:
+            return
+        async with connection.transaction():
+            await connection.execute(CREATE_STAGING_SQL)
+            await connection.copy_records_to_table(STAGING_TABLE, records=records, columns=STAGING_COLUMNS)
+            conflicts = await connection.fetch(MERGE_SQL)
+
+        self.stats.inserted += len(records) - len(conflicts)
+        self.stats.rejected.extend(
+            RejectedRow(row["line"], row["username"], row["email"], "conflict") for row in conflicts
+        )
+        return
+
+    async def run(self, rows: Iterator[tuple[int, dict | None]]) -> ImportStats:
+        start = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                async with async_engine.connect() as conn:
+                    connection = (await conn.get_raw_connection()).driver_connection
+                    loading: asyncio.Task | None = None
+                    while batch := list(islice(rows, self.batch_size)):
+                        self.stats.total += len(batch)
+                        records = await self._prepare(batch, pool)
+                        if loading is not None:
+                            await loading
+                        loading = asyncio.create_task(self._load(connection, records))
+                    if loading is not None:
+                        await loading
+        finally:
+            await async_engine.dispose()
+
+        self.stats.elapsed_seconds = time.perf_counter() - start
+        return self.stats
+
+
+async def import_users(path: Path | None, fmt: ImportFormat, batch_size: int, workers: int) -> ImportStats:
+    """
+    Импорт пользователей из CSV или NDJSON (поля username, email, password, необязательные first_name,
+    second_name, last_name). Пароли во входе - открытым текстом, в БД пишутся хеши Argon2.
+    Args:
+        path: файл, None - stdin
+        fmt: формат входа
+        batch_size: строк в пачке
+        workers: процессов для хеширования, 0 - по числу ядер
+    Returns:
+        статистика импорта с отклоненными строками
+    """
+    importer = UserImporter(batch_size, workers)
+    if path is None:
+        return await importer.run(read_rows(sys.stdin, fmt))
+
+    with path.open("r", encoding="utf-8", newline="") as source:
+        return await importer.run(read_rows(source, fmt))
+
+
+def write_rejected(rejected: list[RejectedRow], path: Path) -> None:
+    """ Отчет об отклоненных строках в CSV """
+    with path.open("w", encoding="utf-8", newline="") as report:
+        writer = csv.writer(report)
+        writer.writerow(("line", "username", "email", "reason"))
+        writer.writerows((row.line, row.username, row.email, row.reason) for row in rejected)
+    return
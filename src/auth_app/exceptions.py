@@ -27,9 +27,23 @@ class AuthHTTPException(AuthBaseException):
             detail = "Введенные пароли не совпадают"
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
 
+    @classmethod
+    def raise_http_429(cls, retry_after: int, detail: str | None = None) -> NoReturn:
+        if detail is None:
+            detail = "Слишком много неудачных попыток входа, повторите позже"
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=detail, headers={"Retry-After": str(retry_after)}
+        )
+
 
 class UserHTTPException(AuthBaseException):
 
+    @classmethod
+    def raise_http_400(cls, detail: str | None = None) -> NoReturn:
+        if detail is None:
+            detail = "Некорректный запрос"
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
     @classmethod
     def raise_http_500(cls, detail: str | None = None) -> NoReturn:
         if detail is None:
@@ -47,3 +61,10 @@ class UserHTTPException(AuthBaseException):
         if detail is None:
             detail = "Пользователь с таким username или email уже существует"
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+    @classmethod
+    def raise_http_503(cls, detail: str | None = None, retry_after: int | None = None) -> NoReturn:
+        if detail is None:
+            detail = "Сервис перегружен, повторите запрос позже"
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=detail, headers=headers)
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import String, UUID, Boolean, DateTime, func, UniqueConstraint
+from sqlalchemy import String, UUID, Boolean, DateTime, func, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.core.database import Base
@@ -53,6 +53,13 @@ class CustomUser(Base):
     __table_args__ = (
         UniqueConstraint("username", name="user_username_key_uniq"),
         UniqueConstraint("email", name="user_email_key_uniq"),
+        # Регистронезависимая уникальность и поиск: WHERE lower(username) = lower(:value)
+        Index("ix_custom_users_username_lower", func.lower(username), unique=True),
+        Index("ix_custom_users_email_lower", func.lower(email), unique=True),
+        # Постраничный вывод по ключу (created, id)
+        Index("ix_custom_users_created_id", "created", "id"),
+        # Инкрементальная выгрузка по водяному знаку updated
+        Index("ix_custom_users_updated_id", "updated", "id"),
     )
 
     def __repr__(self):
@@ -1,5 +1,12 @@
+from src.core.config import settings
 from src.auth_app.repositories.user_pwd_repository import UserPasswordRepo
 from src.auth_app.repositories.user_repository import UserRegisterRepo, UserRegisteredRepo
 
+if settings.DB_ASYNCPG_FAST_PATH:
+    from src.auth_app.repositories.fast_repository import (
+        AsyncpgUserRegisteredRepo as UserRegisteredRepo,
+        AsyncpgUserPasswordRepo as UserPasswordRepo,
+    )
+
 
 __all__ = ["UserRegisterRepo", "UserRegisteredRepo", "UserPasswordRepo"]
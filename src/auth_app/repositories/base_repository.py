@@ -1,83 +1,175 @@
-from sqlalchemy import select, String, Select, or_, exists
-from sqlalchemy.exc import IntegrityError
+from typing import Any, Sequence
+
+from sqlalchemy import select, Select, or_, exists, func, FrozenResult, RowMapping, bindparam, ColumnElement
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth_app.models import CustomUser
+from src.core.database import release_connection, mark_uncommitted, replica_router, AsyncReplicaSessionLocal
 from src.core.logger import logger
 
 
+# Основные данные пользователя для работы с ними
+USER_FIELDS: tuple = (
+    CustomUser.id,
+    CustomUser.username,
+    CustomUser.email,
+    CustomUser.first_name,
+    CustomUser.second_name,
+    CustomUser.last_name,
+    CustomUser.is_active,
+    CustomUser.is_staff,
+    CustomUser.is_superuser,
+)
+
+# Запросы собираются один раз при импорте, значения передаются через bindparam. Ключ кэша компиляции у готового
+# statement вычисляется однажды (memoized), поэтому на каждом вызове нет ни сборки select, ни повторного обхода
+# дерева выражения для поиска в кэше скомпилированных запросов.
+SELECT_USER_FIELDS: Select = select(*USER_FIELDS)
+
+
+def username_equals(value: Any) -> ColumnElement[bool]:
+    """
+    Регистронезависимое сравнение username: lower(username) = lower(value). Выражение совпадает с индексом
+    ix_custom_users_username_lower, без приведения типа столбца, иначе индекс не используется.
+    """
+    return func.lower(CustomUser.username) == func.lower(value)
+
+
+def email_equals(value: Any) -> ColumnElement[bool]:
+    """ Регистронезависимое сравнение email по индексу ix_custom_users_email_lower """
+    return func.lower(CustomUser.email) == func.lower(value)
+
+
+EXISTS_USER_BY_USERNAME: Select = select(exists().where(username_equals(bindparam("username"))))
+
+EXISTS_USER_BY_EMAIL: Select = select(exists().where(email_equals(bindparam("email"))))
+
+EXISTS_USER_BY_USERNAME_OR_EMAIL: Select = select(exists().where(
+    or_(
+        username_equals(bindparam("username")),
+        email_equals(bindparam("email"))
+    )
+))
+
+
 class UserBaseRepo:
 
     @staticmethod
-    def _select_user_fields() -> Select:
+    def _user_fields() -> tuple:
         """ Основные данные пользователя для работы с ними """
+        return USER_FIELDS
 
-        query = select(
-            CustomUser.id,
-            CustomUser.username,
-            CustomUser.email,
-            CustomUser.first_name,
-            CustomUser.second_name,
-            CustomUser.last_name,
-            CustomUser.is_active,
-            CustomUser.is_staff,
-            CustomUser.is_superuser,
+    @classmethod
+    def _select_user_fields(cls) -> Select:
+        return SELECT_USER_FIELDS
+
+    @classmethod
+    async def _insert_user(cls, values: dict, db: AsyncSession) -> RowMapping | None:
+        """
+        Создание пользователя одним запросом: INSERT ... ON CONFLICT DO NOTHING RETURNING. Вернет None, если
+        username или email уже заняты (конфликт определяет уникальное ограничение, без отдельной проверки).
+        """
+        query = (
+            insert(
+                CustomUser
+            ).
+            values(
+                **values
+            ).
+            on_conflict_do_nothing().
+            returning(
+                *cls._user_fields()
+            )
         )
-        return query
+        try:
+            result = await db.execute(query)
+            user_created: RowMapping | None = result.mappings().first()
+        except IntegrityError as exp:
+            logger.error("Ошибка записи в БД при создании пользователя: {err}", err=exp)
+            raise
+        cls._mark_write(db, user_created["id"] if user_created is not None else None)
+        return user_created
+
+    @staticmethod
+    async def _execute_read(
+            query: Select, db: AsyncSession, params: dict | None = None, replica: bool = True, user_ids: Sequence = ()
+    ) -> FrozenResult:
+        """
+        Чтение с реплики, если она настроена и допустима для запроса (replica_router), иначе с основного сервера.
+        Строки забираются сразу (freeze), соединение возвращается в пул.
+        Args:
+            replica: False - только основной сервер (аутентификация, проверка пароля, проверки перед записью)
+            user_ids: id читаемых пользователей: недавно измененные читаются с основного сервера
+        """
+        if replica and await replica_router.use_replica(db, user_ids):
+            try:
+                async with AsyncReplicaSessionLocal() as replica_session:
+                    return (await replica_session.execute(query, params)).freeze()
+            except (DBAPIError, OSError) as exp:
+                logger.error("Реплика недоступна, чтение с основного сервера: {}", exp)
+
+        result = (await db.execute(query, params)).freeze()
+        await release_connection(db)
+        return result
 
     @staticmethod
-    async def _select_execute_query(query: Select, db: AsyncSession):
+    def _mark_write(db: AsyncSession, *user_ids: Any) -> None:
+        """
+        Запись выполнена, но не зафиксирована: фиксирует ее граница единицы работы (unit_of_work), до этого
+        соединение не возвращается в пул. После фиксации чтение измененных пользователей (user_ids) какое-то время
+        идет с основного сервера.
+        """
+        mark_uncommitted(db)
+        replica_router.mark_write(db, [user_id for user_id in user_ids if user_id is not None])
+        return
+
+    @classmethod
+    async def _select_execute_query(
+            cls, query: Select, db: AsyncSession, params: dict | None = None, replica: bool = True,
+            user_ids: Sequence = (),
+    ):
         """ Select запрос в БД """
         try:
-            result = await db.execute(query)
+            result = await cls._execute_read(query, db, params, replica, user_ids)
         except IntegrityError as exp:
             logger.error("Ошибка чтения данных пользователя из БД {}", exp)
             return
-        return result
+        return result()
 
     @classmethod
-    async def _is_exists_user_by_username(cls, username: str, db: AsyncSession) -> bool:
-        query = select(exists().where(CustomUser.username.cast(String) == username))
+    async def _scalar_query(cls, query: Select, db: AsyncSession, params: dict | None = None) -> bool:
+        """ Проверка существования записи перед записью в БД - только с основного сервера """
         try:
-            result: bool = await db.scalar(query)
+            result: bool = (await cls._execute_read(query, db, params, replica=False))().scalar()
         except IntegrityError as exp:
             logger.error("Ошибка чтения БД при проверке пользователя {}", exp)
             result = True
+        return result
 
+    @classmethod
+    async def _is_exists_user_by_username(cls, username: str, db: AsyncSession) -> bool:
+        result: bool = await cls._scalar_query(EXISTS_USER_BY_USERNAME, db, {"username": username})
         return result
 
     @classmethod
     async def _is_exists_user_by_email(cls, email: str, db: AsyncSession) -> bool:
-        query = select(exists().where(CustomUser.email.cast(String) == email))
-        try:
-            result: bool = await db.scalar(query)
-        except IntegrityError as exp:
-            logger.error("Ошибка чтения БД при проверке пользователя {}", exp)
-            result = True
-
+        result: bool = await cls._scalar_query(EXISTS_USER_BY_EMAIL, db, {"email": email})
         return result
 
     @classmethod
     async def _is_exists_user_by_username_or_email(cls, username: str, email: str, db: AsyncSession) -> bool:
-        query = select(exists().where(
-            or_(
-                CustomUser.username.cast(String) == username,
-                CustomUser.email.cast(String) == email
-            )
-        ))
-        try:
-            result: bool = await db.scalar(query)
-        except IntegrityError as exp:
-            logger.error("Ошибка чтения БД при проверке пользователя {}", exp)
-            result = True
-
+        result: bool = await cls._scalar_query(
+            EXISTS_USER_BY_USERNAME_OR_EMAIL, db, {"username": username, "email": email}
+        )
         return result
 
     @classmethod
     async def is_unique_user(cls, username: str | None, email: str | None, db: AsyncSession) -> bool:
         """
-        Проверка на уникальность для полей username и email. Ищет записи по username и email, если переданы. Вернет
-        True, если запись с таким username или email уже существует.
+        Проверка на уникальность для полей username и email. Ищет записи по username и email, если переданы, без
+        учета регистра. Вернет True, если запись с таким username или email уже существует.
         Args:
             username: str - username
             email: str - email
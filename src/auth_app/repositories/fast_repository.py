@@ -0,0 +1,89 @@
+from typing import Any, Sequence
+from uuid import UUID
+
+from asyncpg import PostgresError, Record
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth_app.models import CustomUser
+from src.auth_app.repositories.user_pwd_repository import UserPasswordRepo
+from src.auth_app.repositories.user_repository import UserRegisteredRepo
+from src.core.database import release_connection, replica_router, AsyncReplicaSessionLocal
+from src.core.logger import logger
+
+
+USER_COLUMNS = "id, username, email, first_name, second_name, last_name, is_active, is_staff, is_superuser"
+
+SELECT_USER_BY_ID_SQL = f"SELECT {USER_COLUMNS} FROM custom_users WHERE id = $1"
+
+SELECT_USER_WITH_PASSWORD_BY_USERNAME_SQL = (
+    f"SELECT {USER_COLUMNS}, password, created, updated FROM custom_users WHERE lower(username) = lower($1)"
+)
+
+SELECT_USER_WITH_PASSWORD_BY_EMAIL_SQL = (
+    f"SELECT {USER_COLUMNS}, password, created, updated FROM custom_users WHERE lower(email) = lower($1)"
+)
+
+
+class AsyncpgFetch:
+    """
+    Запрос напрямую через asyncpg-соединение сеанса, минуя Result/RowMapping SQLAlchemy. Соединение берется из
+    того же пула (и той же транзакции, если она начата), что и у сеанса; prepared statements кэширует asyncpg
+    на соединении (в режиме DB_PGBOUNCER кэш отключен, запросы выполняются неименованными statements).
+    """
+
+    @staticmethod
+    async def _driver_fetchrow(db: AsyncSession, sql: str, *args: Any) -> Record | None:
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        return await raw_connection.driver_connection.fetchrow(sql, *args)
+
+    @classmethod
+    async def _fetchrow(
+            cls, db: AsyncSession, sql: str, *args: Any, replica: bool = True, user_ids: Sequence = ()
+    ) -> Record | None:
+        """
+        Одна строка с реплики (если допустимо, как в UserBaseRepo._execute_read) или с основного сервера. Ошибка
+        реплики - чтение с основного сервера; ошибки основного сервера не перехватываются (HTTP 500 и откат
+        транзакции единицы работы), как и в пути через SQLAlchemy.
+        """
+
+        if replica and await replica_router.use_replica(db, user_ids):
+            try:
+                async with AsyncReplicaSessionLocal() as replica_session:
+                    return await cls._driver_fetchrow(replica_session, sql, *args)
+            except (DBAPIError, PostgresError, OSError) as exp:
+                logger.error("Реплика недоступна, чтение с основного сервера: {}", exp)
+
+        record = await cls._driver_fetchrow(db, sql, *args)
+        await release_connection(db)
+        return record
+
+
+class AsyncpgUserRegisteredRepo(AsyncpgFetch, UserRegisteredRepo):
+    """ UserRegisteredRepo с чтением пользователя по id через asyncpg (DB_ASYNCPG_FAST_PATH) """
+
+    @classmethod
+    async def read_one_user_by_id(cls, user_id: UUID, db: AsyncSession) -> dict | None:
+        record = await cls._fetchrow(db, SELECT_USER_BY_ID_SQL, user_id, user_ids=(user_id,))
+        if record is None:
+            return None
+        return dict(record)
+
+
+class AsyncpgUserPasswordRepo(AsyncpgFetch, UserPasswordRepo):
+    """ UserPasswordRepo с чтением пользователя и хеша пароля через asyncpg (DB_ASYNCPG_FAST_PATH) """
+
+    @classmethod
+    async def read_user_with_password(
+            cls, username: str | None, email: str | None, db: AsyncSession
+    ) -> CustomUser | None:
+
+        if username:
+            record = await cls._fetchrow(db, SELECT_USER_WITH_PASSWORD_BY_USERNAME_SQL, username, replica=False)
+        else:
+            record = await cls._fetchrow(db, SELECT_USER_WITH_PASSWORD_BY_EMAIL_SQL, email, replica=False)
+        if record is None:
+            return None
+
+        return CustomUser(**record)
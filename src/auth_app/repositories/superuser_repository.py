@@ -1,13 +1,50 @@
-from typing import Sequence
+from datetime import datetime
+from typing import Sequence, AsyncIterator
+from uuid import UUID
 
-from sqlalchemy import String, RowMapping, update
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import (
+    RowMapping, Select, Update, select, update, bindparam, tuple_, values, column, func, cast, Integer, String,
+    Boolean
+)
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth_app.models import CustomUser
-from src.auth_app.repositories.base_repository import UserBaseRepo
+from src.auth_app.repositories.base_repository import UserBaseRepo, USER_FIELDS, username_equals
+from src.core.database import after_commit
 from src.core.logger import logger
+from src.core.redis.principal_cache import principal_cache
+from src.core.redis.token_version import token_versions
+
+
+# Пользователи по ключу (created, id) - порядок индекса ix_custom_users_created_id
+SELECT_USERS_ORDERED: Select = select(*USER_FIELDS, CustomUser.created).order_by(CustomUser.created, CustomUser.id)
+
+SELECT_USERS_ORDERED_AFTER: Select = SELECT_USERS_ORDERED.where(
+    tuple_(CustomUser.created, CustomUser.id) > tuple_(
+        bindparam("after_created", type_=CustomUser.created.type), bindparam("after_id", type_=CustomUser.id.type)
+    )
+)
+
+SELECT_USERS_PAGE: Select = SELECT_USERS_ORDERED.limit(bindparam("limit"))
+
+SELECT_USERS_PAGE_AFTER: Select = SELECT_USERS_ORDERED_AFTER.limit(bindparam("limit"))
+
+UPDATE_USER_BY_ADMIN: Update = (
+    update(
+        CustomUser
+    ).
+    where(
+        username_equals(bindparam("by_username"))
+    ).
+    returning(
+        CustomUser.id,
+        CustomUser.username,
+        CustomUser.is_active,
+        CustomUser.is_staff,
+        CustomUser.is_superuser
+    )
+)
 
 
 class SuperuserRepo(UserBaseRepo):
@@ -22,32 +59,17 @@ class SuperuserRepo(UserBaseRepo):
             password: password
             db: session
         Returns:
-            True if created, else False
+            True if created, False if username or email already exists
         """
-        query = (
-            insert(
-                CustomUser
-            ).
-            values(
-                username=username,
-                password=password,
-                email=email,
-                is_superuser=True,
-                is_staff=True,
-                is_active=True,
-            )
-        )
-        try:
-            await db.execute(query)
-            await db.commit()
-
-            result = await db.execute(
-                cls._select_user_fields().where(CustomUser.username.cast(String) == username)
-            )
-            user_created: RowMapping = result.mappings().first()
-        except IntegrityError as exp:
-            logger.error("Ошибка записи в БД при создании суперпользователя: {err}", err=exp)
-            return False
+        values = {
+            "username": username,
+            "password": password,
+            "email": email,
+            "is_superuser": True,
+            "is_staff": True,
+            "is_active": True,
+        }
+        user_created: RowMapping | None = await cls._insert_user(values, db)
         if user_created is None:
             return False
 
@@ -55,11 +77,44 @@ class SuperuserRepo(UserBaseRepo):
         return True
 
     @classmethod
-    async def select_users(cls, db: AsyncSession) -> Sequence[RowMapping]:
-        query = cls._select_user_fields()
-        result = await cls._select_execute_query(query=query, db=db)
-        data = result.mappings().all()
-        return data
+    async def select_users_page(
+            cls, limit: int, after: tuple[datetime, UUID] | None, db: AsyncSession
+    ) -> Sequence[RowMapping]:
+        """
+        Страница пользователей по ключу (created, id): не больше limit записей после ключа after.
+        Args:
+            limit: размер страницы
+            after: (created, id) последней записи предыдущей страницы, None - с начала
+            db: Session from get_db()
+        Returns:
+            RowMapping user data с полем created
+        """
+        if after is None:
+            result = await cls._select_execute_query(SELECT_USERS_PAGE, db, {"limit": limit})
+        else:
+            result = await cls._select_execute_query(
+                SELECT_USERS_PAGE_AFTER, db, {"limit": limit, "after_created": after[0], "after_id": after[1]}
+            )
+        if result is None:
+            return []
+        return result.mappings().all()
+
+    @classmethod
+    async def stream_users(
+            cls, after: tuple[datetime, UUID] | None, batch_size: int, db: AsyncSession
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Все пользователи после ключа after через курсор на сервере (stream_results), пачками по batch_size.
+        В памяти - только текущая пачка. Соединение сеанса занято, пока генератор не исчерпан или не закрыт.
+        """
+        if after is None:
+            query, params = SELECT_USERS_ORDERED, {}
+        else:
+            query, params = SELECT_USERS_ORDERED_AFTER, {"after_created": after[0], "after_id": after[1]}
+
+        result = await db.stream(query, params, execution_options={"yield_per": batch_size})
+        async for rows in result.mappings().partitions():
+            yield rows
 
     @classmethod
     async def update_user_by_admin(cls, username: str, data: dict, db: AsyncSession) -> RowMapping | None:
@@ -72,29 +127,111 @@ class SuperuserRepo(UserBaseRepo):
 
         Returns: RowMapping user data
         """
+        try:
+            result = await db.execute(UPDATE_USER_BY_ADMIN, {"by_username": username, **data})
+        except IntegrityError as exp:
+            logger.error("Ошибка изменения данных пользователя из БД {}", exp)
+            return
+
+        user_map: RowMapping = result.mappings().first()
+        cls._mark_write(db, user_map.get("id") if user_map is not None else None)
+        if user_map is not None:
+            after_commit(db, principal_cache.invalidate, user_map.get("id"))
+            after_commit(db, token_versions.bump, user_map.get("id"))
+        logger.success("Данные пользователя username - {} изменены администратором", username)
+        return user_map
+
+    @classmethod
+    async def select_ids_by_usernames(cls, usernames: dict[int, str], db: AsyncSession) -> dict[int, UUID]:
+        """
+        Идентификаторы пользователей по username без учета регистра, одним запросом: custom_users JOIN (VALUES ...)
+        по индексу ix_custom_users_username_lower, с основного сервера. Сравнение выполняет БД, как и в UPDATE.
+        Args:
+            usernames: номер в запросе -> username
+            db: Session from get_db()
+
+        Returns: номер в запросе -> id найденного пользователя
+        """
+        if not usernames:
+            return {}
+        targets = values(column("ord", Integer), column("username", String), name="targets").data(
+            list(usernames.items())
+        )
+        query = (
+            select(
+                targets.c.ord,
+                CustomUser.id
+            ).
+            join_from(
+                targets, CustomUser, username_equals(targets.c.username)
+            )
+        )
+        result = await cls._select_execute_query(query, db, replica=False)
+        if result is None:
+            return {}
+        return {row.ord: row.id for row in result}
+
+    @classmethod
+    async def bulk_update_by_admin(cls, changes: list[dict], db: AsyncSession) -> Sequence[RowMapping] | None:
+        """
+        Изменение полей is_active, is_staff, is_superuser у пачки пользователей одним запросом:
+        UPDATE ... FROM (VALUES ...) RETURNING. Пользователь ищется по id (username заранее разрешает сервис), поле
+        со значением None не меняется. Кэши пользователей сбрасываются после фиксации транзакции.
+        Args:
+            changes: словари с ключами ord (номер в запросе), id, is_active, is_staff, is_superuser
+            db: Session from get_db()
+
+        Returns: RowMapping ord и данные измененных пользователей, None - ошибка БД
+        """
+        fields = ("ord", "id", "is_active", "is_staff", "is_superuser")
+        changes_values = values(
+            column("ord", Integer),
+            column("id", CustomUser.id.type),
+            column("is_active", Boolean),
+            column("is_staff", Boolean),
+            column("is_superuser", Boolean),
+            name="changes",
+        ).data(
+            [tuple(change.get(name) for name in fields) for change in changes]
+        )
+        # None в VALUES - нетипизированный NULL: столбец из одних NULL получит тип text, поэтому явные CAST
+        change = {name: cast(changes_values.c[name], changes_values.c[name].type) for name in fields}
         query = (
             update(
                 CustomUser
             ).
             where(
-                CustomUser.username.cast(String) == username
+                CustomUser.id == change["id"]
+            ).
+            values(
+                is_active=func.coalesce(change["is_active"], CustomUser.is_active),
+                is_staff=func.coalesce(change["is_staff"], CustomUser.is_staff),
+                is_superuser=func.coalesce(change["is_superuser"], CustomUser.is_superuser),
             ).
             returning(
+                changes_values.c.ord,
                 CustomUser.id,
                 CustomUser.username,
                 CustomUser.is_active,
                 CustomUser.is_staff,
                 CustomUser.is_superuser
+            ).
+            execution_options(
+                synchronize_session=False
             )
         )
 
         try:
-            result = await db.execute(query, data)
-            await db.commit()
+            result = await db.execute(query)
         except IntegrityError as exp:
-            logger.error("Ошибка изменения данных пользователя из БД {}", exp)
+            logger.error("Ошибка изменения данных пользователей из БД {}", exp)
             return
 
-        user_map: RowMapping = result.mappings().first()
-        logger.success("Данные пользователя username - {} изменены администратором", username)
-        return user_map
+        user_maps: Sequence[RowMapping] = result.mappings().all()
+        user_ids = [user_map.get("id") for user_map in user_maps]
+        cls._mark_write(db, *user_ids)
+        if user_ids:
+            after_commit(db, principal_cache.invalidate, *user_ids)
+            after_commit(db, token_versions.bump, *user_ids)
+        logger.success("Администратор изменил данные {} пользователей из {}", len(user_maps), len(changes))
+        return user_maps
@@ -1,14 +1,32 @@
 from uuid import UUID
 
-from sqlalchemy import select, String, update, Select, RowMapping
+from sqlalchemy import select, update, Select, Update, RowMapping, bindparam
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth_app.models import CustomUser
-from src.auth_app.repositories.base_repository import UserBaseRepo
+from src.auth_app.repositories.base_repository import UserBaseRepo, username_equals, email_equals
 from src.core.logger import logger
 
 
+SELECT_USER_WITH_PASSWORD_BY_USERNAME: Select = select(CustomUser).where(username_equals(bindparam("username")))
+
+SELECT_USER_WITH_PASSWORD_BY_EMAIL: Select = select(CustomUser).where(email_equals(bindparam("email")))
+
+UPDATE_USER_PASSWORD: Update = (
+    update(
+        CustomUser
+    ).
+    where(
+        CustomUser.id == bindparam("user_id")
+    ).
+    returning(
+        CustomUser.id,
+        CustomUser.username
+    )
+)
+
+
 class UserPasswordRepo(UserBaseRepo):
 
     @classmethod
@@ -16,28 +34,21 @@ class UserPasswordRepo(UserBaseRepo):
             cls, username: str | None, email: str | None, db: AsyncSession
     ) -> CustomUser | None:
 
+        """ Пользователь с хешем пароля для проверки пароля - только с основного сервера """
         if username:
-            query = cls._get_query_by_username(username)
+            result = await cls._select_execute_query(
+                SELECT_USER_WITH_PASSWORD_BY_USERNAME, db, {"username": username}, replica=False
+            )
         else:
-            query = cls._get_query_by_email(email)
-
-        result = await cls._select_execute_query(query, db)
+            result = await cls._select_execute_query(
+                SELECT_USER_WITH_PASSWORD_BY_EMAIL, db, {"email": email}, replica=False
+            )
         if result is None:
             return None
 
         user_instance = result.scalar_one_or_none()
         return user_instance
 
-    @staticmethod
-    def _get_query_by_username(username: str) -> Select:
-        query = select(CustomUser).where(CustomUser.username.cast(String) == username)
-        return query
-
-    @staticmethod
-    def _get_query_by_email(email: str) -> Select:
-        query = select(CustomUser).where(CustomUser.email.cast(String) == email)
-        return query
-
     @classmethod
     async def update_user_password(cls, user_id: UUID, password: str, db: AsyncSession) -> RowMapping | None:
         """
@@ -47,24 +58,9 @@ class UserPasswordRepo(UserBaseRepo):
             password: new password to update user
             db: Session from get_db()
         """
-        query = (
-            update(
-                CustomUser
-            ).
-            where(
-                CustomUser.id == user_id
-            ).
-            values(
-                password=password,
-            ).
-            returning(
-                CustomUser.id,
-                CustomUser.username
-            )
-        )
         try:
-            result = await db.execute(query)
-            await db.commit()
+            result = await db.execute(UPDATE_USER_PASSWORD, {"user_id": user_id, "password": password})
+            cls._mark_write(db, user_id)
         except IntegrityError as exp:
             logger.error("Ошибка изменения записи в БД при смене пароля пользователя: {err}", err=exp)
             return
@@ -1,19 +1,59 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Sequence
 from uuid import UUID
 
-from sqlalchemy import delete, String, update, RowMapping
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import delete, update, Delete, Update, RowMapping, Select, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth_app.models import CustomUser
-from src.auth_app.repositories.base_repository import UserBaseRepo
+from src.auth_app.repositories.base_repository import (
+    UserBaseRepo, SELECT_USER_FIELDS, USER_FIELDS, username_equals, email_equals
+)
 from src.core.logger import logger
 
 if TYPE_CHECKING:
     from src.auth_app.schemes.user_schemes import UserRegisterSchema, UserWorkSchema
 
 
+SELECT_USER_BY_ID: Select = SELECT_USER_FIELDS.where(CustomUser.id == bindparam("user_id"))
+
+SELECT_USERS_BY_IDS: Select = SELECT_USER_FIELDS.where(
+    CustomUser.id == any_(bindparam("ids", type_=ARRAY(CustomUser.id.type)))
+)
+
+SELECT_USER_BY_USERNAME: Select = SELECT_USER_FIELDS.where(username_equals(bindparam("username")))
+
+SELECT_USER_BY_EMAIL: Select = SELECT_USER_FIELDS.where(email_equals(bindparam("email")))
+
+# Имена параметров условия не совпадают с именами столбцов: остальные ключи параметров идут в SET
+DELETE_USER: Delete = (
+    delete(
+        CustomUser
+    ).
+    where(
+        username_equals(bindparam("by_username")),
+        email_equals(bindparam("by_email")),
+    ).
+    returning(
+        CustomUser.username,
+        CustomUser.email,
+    )
+)
+
+UPDATE_USER_BY_ID: Update = (
+    update(
+        CustomUser
+    ).
+    where(
+        CustomUser.id == bindparam("user_id")
+    ).
+    returning(
+        *USER_FIELDS
+    )
+)
+
+
 class UserRegisterRepo(UserBaseRepo):
     """ Для регистрации пользователя """
 
@@ -25,29 +65,13 @@ class UserRegisterRepo(UserBaseRepo):
             user: schema UserRegisterSchema
             db: session
         Returns:
-            created user's dict fields
+            created user's dict fields or None if username or email already exists
         """
-        query = (
-            insert(
-                CustomUser
-            ).
-            values(
-                username=user.username,
-                password=user.password,
-                email=user.email,
-            )
+        user_created: RowMapping | None = await cls._insert_user(
+            {"username": user.username, "password": user.password, "email": user.email}, db
         )
-        try:
-            await db.execute(query)
-            await db.commit()
-
-            result = await db.execute(
-                cls._select_user_fields().where(CustomUser.username.cast(String) == user.username)
-            )
-            user_created: RowMapping = result.mappings().first()
-        except IntegrityError as exp:
-            logger.error("Ошибка записи в БД при создании пользователя: {err}", err=exp)
-            return
+        if user_created is None:
+            return None
 
         logger.success("Пользователь {name} зарегистрирован, email {email}", name=user.username, email=user.email)
         return user_created
@@ -64,22 +88,9 @@ class UserRegisteredRepo(UserBaseRepo):
             user: UserSchema data
             db: Session from get_db()
         """
-        query = (
-            delete(
-                CustomUser
-            ).
-            where(
-                CustomUser.username.cast(String) == user.username,
-                CustomUser.email.cast(String) == user.email,
-            ).
-            returning(
-                CustomUser.username,
-                CustomUser.email,
-            )
-        )
         try:
-            result = await db.execute(query)
-            await db.commit()
+            result = await db.execute(DELETE_USER, {"by_username": user.username, "by_email": user.email})
+            cls._mark_write(db, user.id)
         except IntegrityError as exp:
             logger.error("Ошибка удаления данных пользователя из БД {}", exp)
             return
@@ -99,29 +110,9 @@ class UserRegisteredRepo(UserBaseRepo):
 
         Returns: RowMapping user data
         """
-        query = (
-            update(
-                CustomUser
-            ).
-            where(
-                CustomUser.id == user_id
-            ).
-            returning(
-                CustomUser.id,
-                CustomUser.username,
-                CustomUser.email,
-                CustomUser.first_name,
-                CustomUser.second_name,
-                CustomUser.last_name,
-                CustomUser.is_active,
-                CustomUser.is_staff,
-                CustomUser.is_superuser,
-            )
-        )
-
         try:
-            result = await db.execute(query, data)
-            await db.commit()
+            result = await db.execute(UPDATE_USER_BY_ID, {"user_id": user_id, **data})
+            cls._mark_write(db, user_id)
         except IntegrityError as exp:
             logger.error("Ошибка изменения данных пользователя из БД {}", exp)
             return
@@ -132,19 +123,24 @@ class UserRegisteredRepo(UserBaseRepo):
 
     @classmethod
     async def read_one_user_by_id(cls, user_id: UUID, db: AsyncSession) -> RowMapping | None:
-        query = cls._select_user_fields().where(CustomUser.id == user_id)
-
-        result = await cls._select_execute_query(query, db)
+        result = await cls._select_execute_query(SELECT_USER_BY_ID, db, {"user_id": user_id}, user_ids=(user_id,))
         if result is None:
             return None
         user_map: RowMapping = result.mappings().first()
         return user_map
 
     @classmethod
-    async def read_one_user_by_username(cls, username: str, db: AsyncSession) -> RowMapping | None:
-        query = cls._select_user_fields().where(CustomUser.username.cast(String) == username)
+    async def read_users_by_ids(cls, user_ids: list[UUID], db: AsyncSession) -> Sequence[RowMapping]:
+        """ Пользователи по списку id одним запросом: WHERE id = ANY(:ids) """
+
+        result = await cls._select_execute_query(SELECT_USERS_BY_IDS, db, {"ids": user_ids}, user_ids=user_ids)
+        if result is None:
+            return []
+        return result.mappings().all()
 
-        result = await cls._select_execute_query(query, db)
+    @classmethod
+    async def read_one_user_by_username(cls, username: str, db: AsyncSession) -> RowMapping | None:
+        result = await cls._select_execute_query(SELECT_USER_BY_USERNAME, db, {"username": username})
         if result is None:
             return None
         user_map: RowMapping = result.mappings().first()
@@ -152,9 +148,7 @@ class UserRegisteredRepo(UserBaseRepo):
 
     @classmethod
     async def read_one_user_by_email(cls, email: str, db: AsyncSession) -> RowMapping | None:
-        query = cls._select_user_fields().where(CustomUser.email.cast(String) == email)
-
-        result = await cls._select_execute_query(query, db)
+        result = await cls._select_execute_query(SELECT_USER_BY_EMAIL, db, {"email": email})
         if result is None:
             return None
         user_map: RowMapping = result.mappings().first()
@@ -2,6 +2,8 @@ from typing import Annotated
 
 from pydantic import BaseModel, Field, model_validator
 
+from src.auth_app.schemes.user_schemes import UserWorkSchema
+
 
 class AuthSchema(BaseModel):
     """ Login """
@@ -15,3 +17,19 @@ class AuthSchema(BaseModel):
         if not self.username and not self.email:
             raise ValueError("Имя пользователя или почта должны быть введены")
         return self
+
+
+class IntrospectSchema(BaseModel):
+    """ Пачка access токенов для проверки """
+
+    tokens: Annotated[list[str], Field(min_length=1, max_length=1000, description="Access токены")]
+
+
+class IntrospectResultSchema(BaseModel):
+    active: Annotated[bool, Field(description="Токен действителен и пользователь активен")]
+    claims: Annotated[dict | None, Field(default=None, description="Payload токена")]
+    user: Annotated[UserWorkSchema | None, Field(default=None, description="Пользователь")]
+
+
+class IntrospectResponseSchema(BaseModel):
+    results: Annotated[list[IntrospectResultSchema], Field(default_factory=list, description="В порядке запроса")]
@@ -1,7 +1,7 @@
 from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, Field, EmailStr, AfterValidator
+from pydantic import BaseModel, Field, EmailStr, AfterValidator, model_validator
 
 from src.auth_app.schemes.validators import validate_password, validate_username
 
@@ -49,6 +49,9 @@ class UserWorkSchema(BaseModel):
 
 class UsersAllSchema(BaseModel):
     users: Annotated[list[UserWorkSchema], Field(default_factory=list, description="Пользователи")]
+    next_cursor: Annotated[
+        str | None, Field(default=None, description="Курсор следующей страницы, None - страница последняя")
+    ]
 
 
 class UserServiceFieldsSchema(BaseModel):
@@ -56,3 +59,45 @@ class UserServiceFieldsSchema(BaseModel):
     is_active: Annotated[bool | None, Field(default=None, description="Активированный пользователь")]
     is_staff: Annotated[bool | None, Field(default=None, description="Сотрудник")]
     is_superuser: Annotated[bool | None, Field(default=None, description="Администратор")]
+
+
+class UserServiceFieldsBulkItemSchema(BaseModel):
+    """ Изменение сервисных полей одного пользователя: пользователь по id или username """
+
+    id: Annotated[UUID | None, Field(default=None, description="Идентификатор пользователя")]
+    username: Annotated[str | None, Field(default=None, description="Пользователь")]
+    is_active: Annotated[bool | None, Field(default=None, description="Активированный пользователь")]
+    is_staff: Annotated[bool | None, Field(default=None, description="Сотрудник")]
+    is_superuser: Annotated[bool | None, Field(default=None, description="Администратор")]
+
+    @model_validator(mode="after")
+    def required_one(self):
+        if (self.id is None) == (self.username is None):
+            raise ValueError("Нужен id или username пользователя, одно из двух")
+        if self.is_active is None and self.is_staff is None and self.is_superuser is None:
+            raise ValueError("Нужно хотя бы одно из полей is_active, is_staff, is_superuser")
+        return self
+
+
+class UserServiceFieldsBulkSchema(BaseModel):
+    users: Annotated[
+        list[UserServiceFieldsBulkItemSchema],
+        Field(min_length=1, max_length=5000, description="Изменения, каждый пользователь - не больше одного раза")
+    ]
+
+
+class UserServiceFieldsBulkResultSchema(BaseModel):
+    id: Annotated[UUID | None, Field(default=None, description="Идентификатор пользователя")]
+    username: Annotated[str | None, Field(default=None, description="Пользователь")]
+    updated: Annotated[bool, Field(description="Изменен, False - пользователь не найден")]
+    is_active: Annotated[bool | None, Field(default=None, description="Активированный пользователь")]
+    is_staff: Annotated[bool | None, Field(default=None, description="Сотрудник")]
+    is_superuser: Annotated[bool | None, Field(default=None, description="Администратор")]
+
+
+class UserServiceFieldsBulkResponseSchema(BaseModel):
+    results: Annotated[
+        list[UserServiceFieldsBulkResultSchema], Field(default_factory=list, description="В порядке запроса")
+    ]
+    updated: Annotated[int, Field(description="Изменено пользователей")]
+    not_found: Annotated[int, Field(description="Не найдено пользователей")]
@@ -0,0 +1,72 @@
+from uuid import UUID
+
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth_app.exceptions import UserHTTPException
+from src.auth_app.repositories.superuser_repository import SuperuserRepo
+from src.auth_app.schemes.user_schemes import (
+    UserServiceFieldsBulkSchema, UserServiceFieldsBulkResultSchema, UserServiceFieldsBulkResponseSchema
+)
+
+
+class ServiceFieldsBulkService:
+    """ Изменение сервисных полей пачки пользователей администратором: один запрос, одна транзакция """
+
+    def __init__(self, db: AsyncSession):
+        self.db_session: AsyncSession = db
+
+    async def _resolve_targets(self, body: UserServiceFieldsBulkSchema) -> list[UUID | None]:
+        """
+        id пользователя для каждого изменения: username заменяется на id, None - пользователь не найден. Один
+        пользователь - не больше одного раза (в том числе по id в одном изменении и по username в другом), иначе
+        какое из изменений применится, не определено.
+        """
+        usernames = {i: item.username for i, item in enumerate(body.users) if item.id is None}
+        ids_by_username = await SuperuserRepo.select_ids_by_usernames(usernames, self.db_session)
+        targets = [item.id if item.id is not None else ids_by_username.get(i) for i, item in enumerate(body.users)]
+
+        keys = [
+            target if target is not None else body.users[i].username.lower() for i, target in enumerate(targets)
+        ]
+        if len(set(keys)) != len(keys):
+            UserHTTPException.raise_http_400(detail="Пользователь указан в запросе несколько раз")
+        return targets
+
+    async def update_service_fields(self, body: UserServiceFieldsBulkSchema) -> UserServiceFieldsBulkResponseSchema:
+        """
+        Применяет изменения body и возвращает результат по каждому пользователю в порядке запроса.
+        Args:
+            body: изменения по id или username
+        Returns:
+            UserServiceFieldsBulkResponseSchema
+        """
+        targets = await self._resolve_targets(body)
+
+        changes = [
+            {"ord": i, **item.model_dump(exclude={"username"}), "id": target}
+            for i, (item, target) in enumerate(zip(body.users, targets)) if target is not None
+        ]
+        user_maps = await SuperuserRepo.bulk_update_by_admin(changes, self.db_session) if changes else []
+        if user_maps is None:
+            UserHTTPException.raise_http_500()
+
+        updated: dict[int, RowMapping] = {user_map["ord"]: user_map for user_map in user_maps}
+        results = []
+        for i, item in enumerate(body.users):
+            user_map = updated.get(i)
+            if user_map is None:
+                results.append(UserServiceFieldsBulkResultSchema(id=item.id, username=item.username, updated=False))
+                continue
+            results.append(UserServiceFieldsBulkResultSchema(
+                id=user_map["id"],
+                username=user_map["username"],
+                updated=True,
+                is_active=user_map["is_active"],
+                is_staff=user_map["is_staff"],
+                is_superuser=user_map["is_superuser"],
+            ))
+
+        return UserServiceFieldsBulkResponseSchema(
+            results=results, updated=len(updated), not_found=len(results) - len(updated)
+        )
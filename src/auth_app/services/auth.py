@@ -1,23 +1,62 @@
-from typing import NoReturn
+import ipaddress
+from typing import NoReturn, AsyncIterator
 
 from fastapi import Request, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.admission import AdmissionController, AdmissionRejected
+from src.core.config import settings
+from src.core.crypto_executor import crypto_executor
 from src.core.database import get_async_db
+from src.core.redis.login_throttle import login_throttle
+from src.core.redis.principal_cache import principal_cache
 from src.core.redis.redis import redis_user_ctx
+from src.core.redis.revoked_tokens import revoked_tokens
+from src.core.redis.token_version import token_versions
 from src.auth_app.services.user import CurrentUser
 from src.auth_app.repositories import UserRegisteredRepo
+from src.auth_app.schemes.auth_schemes import AuthSchema
 from src.auth_app.schemes.user_schemes import UserWorkSchema
 from src.auth_app.services.token import app_token, TypeToken
 from src.auth_app.exceptions import UserHTTPException, AuthHTTPException
 
 
+# Лимит по умолчанию - по два запроса на воркер пула хеширования
+crypto_admission_controller = AdmissionController(
+    limit=settings.ADMISSION_CRYPTO_LIMIT or crypto_executor.workers * 2,
+    deadline=settings.ADMISSION_DEADLINE_MS / 1000,
+)
+
+
 class Authentication:
     def __init__(self, request: Request, payload: dict, db: AsyncSession):
         self.request = request
         self.payload = payload
         self.db = db
         self.request.state.user = None
+        self.request.state.payload = payload
+
+    async def _authenticate_by_claims(self) -> bool:
+        """
+        Stateless режим: пользователь из данных токена, проверяется только версия токенов. Вернет False, если
+        версию узнать не удалось (нужна проверка по БД).
+        """
+        version = await token_versions.get(self.payload["uid"])
+        if version is None:
+            return False
+        if version != self.payload["ver"]:
+            AuthHTTPException.raise_http_403("Ошибка аутентификации")
+
+        user = UserWorkSchema(
+            id=self.payload["uid"],
+            username=self.payload.get("username"),
+            email=self.payload.get("email"),
+            is_active=self.payload.get("is_active"),
+            is_staff=self.payload.get("is_staff"),
+            is_superuser=self.payload.get("is_superuser"),
+        )
+        self.request.state.user = CurrentUser(db_session=self.db, current_user=user)
+        return True
 
     async def _authenticate(self) -> None:
         """
@@ -25,7 +64,17 @@ class Authentication:
         Returns:
             None
         """
-        user_map = await UserRegisteredRepo.read_one_user_by_id(self.payload.get("uid"), self.db)
+        if settings.STATELESS_ACCESS_TOKENS and self.payload.get("ver") is not None:
+            if await self._authenticate_by_claims():
+                return None
+
+        uid = self.payload.get("uid")
+        user_map = await principal_cache.get(uid)
+        if user_map is None:
+            user_map = await UserRegisteredRepo.read_one_user_by_id(uid, self.db)
+            if user_map:
+                await principal_cache.set(uid, dict(user_map))
+
         user = UserWorkSchema(**user_map) if user_map else UserHTTPException.raise_http_404()
         self.request.state.user = CurrentUser(db_session=self.db, current_user=user)
         return None
@@ -39,7 +88,9 @@ class Authentication:
 
 
 async def authenticate(
-        request: Request, header: str = Depends(TypeToken.ACCESS.value), db: AsyncSession = Depends(get_async_db)
+        request: Request,
+        header: str = Depends(TypeToken.ACCESS.value),
+        db: AsyncSession = Depends(get_async_db, scope="function"),
 ) -> bool:
     """
     Использовать для апи, в которых нужна аутентификация. Вернет True или вызовет ошибку аутентификации.
@@ -51,6 +102,9 @@ async def authenticate(
         True if token is valid else raises exception
     """
     payload = app_token.verify_access_token(header)
+    if await revoked_tokens.is_revoked(request.app.state.redis_client, payload.get("jti")):
+        AuthHTTPException.raise_http_403("Ошибка аутентификации")
+
     auth: bool = await Authentication(request, payload, db).is_authenticate()
 
     redis_user_ctx.set(request.state.user.current_user.username)  # username для формирования ключа Redis
@@ -58,7 +112,9 @@ async def authenticate(
 
 
 async def refresh_tokens(
-        request: Request, header: str = Depends(TypeToken.REFRESH.value), db: AsyncSession = Depends(get_async_db)
+        request: Request,
+        header: str = Depends(TypeToken.REFRESH.value),
+        db: AsyncSession = Depends(get_async_db, scope="function"),
 ) -> bool:
     """ Предназначено для обновления токенов. В заголовке использовать имя 'RefreshToken' """
 
@@ -75,3 +131,68 @@ async def available_admin(request: Request) -> NoReturn:
         AuthHTTPException.raise_http_403()
 
     return
+
+
+async def available_staff(request: Request) -> NoReturn:
+    """ Устанавливает доступ только для персонала и администратора (сервисные учетные записи) """
+
+    user: CurrentUser = request.state.user
+    if not isinstance(user, CurrentUser) or not (user.current_user.is_staff or user.current_user.is_superuser):
+        AuthHTTPException.raise_http_403()
+
+    return
+
+
+async def crypto_admission() -> AsyncIterator[None]:
+    """
+    Для апи с хешированием паролей (Argon2). Ограничивает число одновременных запросов, сверх лимита - очередь
+    с дедлайном, затем HTTP 503 с Retry-After.
+    """
+    try:
+        async with crypto_admission_controller.slot():
+            yield
+    except AdmissionRejected as exp:
+        UserHTTPException.raise_http_503(retry_after=exp.retry_after)
+
+
+# Адреса/сети обратных прокси (TRUSTED_PROXIES), которым доверяется заголовок X-Forwarded-For
+TRUSTED_PROXIES = [ipaddress.ip_network(network, strict=False) for network in settings.TRUSTED_PROXIES]
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str | None:
+    """
+    IP клиента для ограничения попыток входа. Если запрос пришел от доверенного прокси (TRUSTED_PROXIES),
+    X-Forwarded-For разбирается справа налево, доверенные прокси пропускаются: первый недоверенный адрес - клиент
+    (левее него значения задает сам клиент). None, если адрес клиента не определить (все адреса - прокси): иначе
+    все клиенты за прокси делили бы один лимит по IP, и ограничение по IP не применяется.
+    """
+    peer = request.client.host if request.client else None
+    if peer is None or not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = ",".join(request.headers.getlist("x-forwarded-for"))
+    for address in reversed([address.strip() for address in forwarded.split(",") if address.strip()]):
+        if not _is_trusted_proxy(address):
+            return address
+    return None
+
+
+async def check_login_throttle(request: Request, user: AuthSchema) -> None:
+    """
+    Для /login, до обращения к БД и хеширования. Превышен лимит неудачных попыток по пользователю или IP -
+    HTTP 429 с Retry-After.
+    """
+    retry_after: int = await login_throttle.retry_after(
+        request.app.state.redis_client, user.username or user.email, client_ip(request)
+    )
+    if retry_after:
+        AuthHTTPException.raise_http_429(retry_after)
+    return
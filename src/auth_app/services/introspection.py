@@ -0,0 +1,55 @@
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from src.core.redis.revoked_tokens import revoked_tokens
+from src.auth_app.repositories import UserRegisteredRepo
+from src.auth_app.schemes.auth_schemes import IntrospectResultSchema, IntrospectResponseSchema
+from src.auth_app.schemes.user_schemes import UserWorkSchema
+from src.auth_app.services.token import app_token
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class IntrospectionService:
+
+    def __init__(self, redis_client: "Redis", db: "AsyncSession"):
+        self.redis_client: "Redis" = redis_client
+        self.db_session: "AsyncSession" = db
+
+    async def _active_payloads(self, tokens: list[str]) -> list[dict | None]:
+        """ Проверенные и не отозванные payload, None на месте недействительных """
+
+        payloads = app_token.verify_access_tokens(tokens)
+        for i, payload in enumerate(payloads):
+            if payload is not None and await revoked_tokens.is_revoked(self.redis_client, payload.get("jti")):
+                payloads[i] = None
+        return payloads
+
+    async def introspect(self, tokens: list[str]) -> IntrospectResponseSchema:
+        """
+        Проверка пачки токенов: подписи проверяются в памяти, пользователи читаются одним запросом.
+        Args:
+            tokens: access tokens
+        Returns:
+            IntrospectResponseSchema, результаты в порядке tokens
+        """
+        payloads = await self._active_payloads(tokens)
+
+        user_ids = {UUID(payload["uid"]) for payload in payloads if payload is not None}
+        users: dict[UUID, UserWorkSchema] = {}
+        if user_ids:
+            for user_map in await UserRegisteredRepo.read_users_by_ids(list(user_ids), self.db_session):
+                user = UserWorkSchema(**user_map)
+                users[user.id] = user
+
+        results = []
+        for payload in payloads:
+            user = users.get(UUID(payload["uid"])) if payload is not None else None
+            if user is None or not user.is_active:
+                results.append(IntrospectResultSchema(active=False))
+                continue
+            results.append(IntrospectResultSchema(active=True, claims=payload, user=user))
+
+        return IntrospectResponseSchema(results=results)
@@ -0,0 +1,53 @@
+import hashlib
+import json
+from typing import TYPE_CHECKING
+
+from src.core.config import settings
+from src.core.keyring import keyring
+
+if TYPE_CHECKING:
+    from src.core.keyring import VerificationKey
+
+
+class JWKSDocument:
+    """
+    Документ JWKS с ключами проверки подписи. Тело и ETag собираются один раз и пересобираются только после
+    перезагрузки ключей в keyring.
+    """
+
+    def __init__(self):
+        self._generation: int = -1
+        self.body: bytes = b""
+        self.etag: str = ""
+
+    def _build(self, keys: list["VerificationKey"]) -> None:
+        self.body = json.dumps(
+            {"keys": [key.jwk for key in keys]}, separators=(",", ":"), sort_keys=True
+        ).encode("utf-8")
+        self.etag = '"{}"'.format(hashlib.sha256(self.body).hexdigest()[:32])
+        self._generation = keyring.generation
+        return
+
+    def get(self) -> tuple[bytes, str]:
+        """ (body, etag) """
+        keys = keyring.verification_keys  # заодно проверяет изменение файлов ключей
+        if self._generation != keyring.generation:
+            self._build(keys)
+        return self.body, self.etag
+
+    @staticmethod
+    def is_not_modified(if_none_match: str | None, etag: str) -> bool:
+        """ Сравнение If-None-Match с ETag (слабое сравнение, RFC 9110) """
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in tags
+
+    @property
+    def cache_control(self) -> str:
+        return f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"
+
+
+jwks_document = JWKSDocument()
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, Any
 from uuid import UUID
 
 from argon2 import PasswordHasher
@@ -6,7 +6,12 @@ from argon2.exceptions import VerifyMismatchError, HashingError, VerificationErr
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import RowMapping
 
+from src.core.config import settings
+from src.core.database import after_commit
+from src.core.crypto_executor import crypto_executor, CryptoExecutorBusy
 from src.core.logger import logger
+from src.core.redis.principal_cache import principal_cache
+from src.core.redis.token_version import token_versions
 from src.auth_app.exceptions import AuthHTTPException, UserHTTPException
 from src.auth_app.schemes.auth_schemes import AuthSchema
 from src.auth_app.repositories import UserPasswordRepo
@@ -17,19 +22,31 @@ if TYPE_CHECKING:
     from src.auth_app.services.user import CurrentUser
 
 
-ph = PasswordHasher()
+ph = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
 
 
 def get_hasher() -> PasswordHasher:
     return ph
 
 
+async def run_hasher(func: Callable, *args) -> Any:
+    """ Вызов хешера в пуле crypto_executor. Переполненная очередь - HTTP 503 """
+    try:
+        return await crypto_executor.run(func, *args)
+    except CryptoExecutorBusy:
+        UserHTTPException.raise_http_503(retry_after=1)
+
+
 class Password:
 
     @classmethod
-    def hashing_password(cls, pwd: str) -> str:
+    async def hashing_password(cls, pwd: str) -> str:
         try:
-            hash_pwd = get_hasher().hash(password=pwd)
+            hash_pwd = await run_hasher(get_hasher().hash, pwd)
         except HashingError as exp:
             logger.error("Хеширование не удалось: {}", exp.args[0])
             UserHTTPException.raise_http_500()
@@ -42,7 +59,7 @@ class Password:
         if not user_instance:
             AuthHTTPException.raise_http_401()
         try:
-            get_hasher().verify(user_instance.password, user_input.password)
+            await run_hasher(get_hasher().verify, user_instance.password, user_input.password)
         except (VerifyMismatchError, VerificationError) as exp:
             logger.info("Проверка пароля: {}", exp.args[0])
             AuthHTTPException.raise_http_401()
@@ -52,15 +69,23 @@ class Password:
         return user_instance
 
     async def _check_rehash_password(self, pwd: str, hashed_pwd: str, user_id: UUID, db: AsyncSession) -> None:
+        """
+        Перехеширование пароля с текущими параметрами. Выполняется в SAVEPOINT: при ошибке откатывается только
+        перехеширование, запрос продолжается со старым хешем. Фиксируется вместе с остальной работой запроса.
+        """
         if get_hasher().check_needs_rehash(hashed_pwd):
-            new_hash_pwd = self.hashing_password(pwd)
+            new_hash_pwd = await self.hashing_password(pwd)
+            savepoint = await db.begin_nested()
             user_returning = await UserPasswordRepo.update_user_password(
                 user_id=user_id,
                 password=new_hash_pwd,
                 db=db
             )
             if user_returning is None:
-                UserHTTPException.raise_http_500()
+                await savepoint.rollback()
+                logger.error("Перехеширование пароля пользователя {} не выполнено", user_id)
+                return
+            await savepoint.commit()
         return
 
     async def change_password(self, user_id: UUID, pwd: str, db: AsyncSession) -> RowMapping | None:
@@ -78,6 +103,8 @@ class Password:
             password=pwd,
             db=db
         )
+        after_commit(db, principal_cache.invalidate, user_id)
+        after_commit(db, token_versions.bump, user_id)
         return user_returning
 
     def reset_password(self) -> bool: ...
@@ -90,7 +117,7 @@ class ChangePasswordService:
 
     def __init__(self, user: "CurrentUser", pwd: ChangePasswordSchema):
         self.pwd_old: str = pwd.old_password
-        self.pwd_new_hash: str = password.hashing_password(pwd.new_password)
+        self.pwd_new: str = pwd.new_password
         self.user: "CurrentUser" = user
 
     async def update_current_password(self):
@@ -100,10 +127,11 @@ class ChangePasswordService:
 
         auth = AuthSchema(username=self.user.current_user.username, password=self.pwd_old)
         await password.verify_password(auth, self.user.db_session)
+        pwd_new_hash: str = await password.hashing_password(self.pwd_new)
 
         user_fields: RowMapping = await password.change_password(
             user_id=self.user.current_user.id,
-            pwd=self.pwd_new_hash,
+            pwd=pwd_new_hash,
             db=self.user.db_session
         )
         if user_fields is None:
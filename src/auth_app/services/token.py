@@ -7,12 +7,12 @@ import jwt
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.security import APIKeyHeader
-from argon2.exceptions import VerifyMismatchError, HashingError, VerificationError
 
-from src.core.logger import logger
 from src.auth_app.schemes.user_schemes import UserWorkSchema
-from src.auth_app.services.password import get_hasher
+from src.auth_app.services.token_digest import get_token_digest, verify_token_digest
+from src.auth_app.services.token_cache import access_token_cache
 from src.core.config import settings
+from src.core.keyring import keyring
 
 
 class TypeToken(Enum):
@@ -34,15 +34,24 @@ class Payload:
     iat: datetime
     nbf: datetime
     type: str | None = None
+    # stateless access токен
+    username: str | None = None
+    email: str | None = None
+    is_active: bool | None = None
+    is_staff: bool | None = None
+    is_superuser: bool | None = None
+    ver: int | None = None
 
     def as_dict(self) -> dict:
-        return asdict(self)
+        return {key: value for key, value in asdict(self).items() if value is not None}
 
 
 class Token:
 
     @staticmethod
-    def __get_payload(user_id: UUID, token_type: str) -> Payload:
+    def __get_payload(user: UserWorkSchema, token_type: str, version: int | None = None) -> Payload:
+        """ С version access токен содержит данные пользователя (stateless режим) """
+        user_id: UUID = user.id
         current_time = datetime.now(timezone.utc)
 
         if token_type == TypeToken.ACCESS.name:
@@ -62,12 +71,22 @@ class Token:
             nbf=current_time,
             type=token_type,
         )
+        if token_type == TypeToken.ACCESS.name and version is not None:
+            payload.username = user.username
+            payload.email = user.email
+            payload.is_active = user.is_active
+            payload.is_staff = user.is_staff
+            payload.is_superuser = user.is_superuser
+            payload.ver = version
         return payload
 
-    def _create_token(self, user: UserWorkSchema, token_type):
-        payload: Payload = self.__get_payload(user.id, token_type)
+    def _create_token(self, user: UserWorkSchema, token_type, version: int | None = None):
+        payload: Payload = self.__get_payload(user, token_type, version)
+        kid, private_key = keyring.signing_key
         try:
-            encoded = jwt.encode(payload=payload.as_dict(), key=settings.private_key, algorithm=settings.ALGORITHM)
+            encoded = jwt.encode(
+                payload=payload.as_dict(), key=private_key, algorithm=settings.ALGORITHM, headers={"kid": kid}
+            )
         except jwt.InvalidKeyError:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="server_error"
@@ -81,14 +100,23 @@ class Token:
 
         encoded = encoded.replace("JWT ", "")
         try:
-            payload = jwt.decode(encoded, settings.public_key, algorithms=[settings.ALGORITHM])
-        except (jwt.ExpiredSignatureError, jwt.DecodeError):
+            kid = jwt.get_unverified_header(encoded).get("kid")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ошибка аутентификации")
+
+        public_key = keyring.get_verification_key(kid)
+        if public_key is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ошибка аутентификации")
+
+        try:
+            payload = jwt.decode(encoded, public_key, algorithms=[settings.ALGORITHM])
+        except jwt.InvalidTokenError:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ошибка аутентификации")
         return payload
 
-    def get_access_token(self, user: UserWorkSchema):
+    def get_access_token(self, user: UserWorkSchema, version: int | None = None):
         token_type: str = TypeToken.ACCESS.name
-        token: str = self._create_token(user, token_type)
+        token: str = self._create_token(user, token_type, version)
         return token
 
     def get_refresh_token(self, user: UserWorkSchema):
@@ -97,31 +125,41 @@ class Token:
         return token
 
     def verify_access_token(self, token: str) -> dict:
+        payload = access_token_cache.get(token)
+        if payload is not None:
+            return payload
+
         payload = self._decode_token(token)
         if payload.get("type") != TypeToken.ACCESS.name:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ошибка аутентификации")
+
+        access_token_cache.set(token, payload)
         return payload
 
+    def verify_access_tokens(self, tokens: list[str]) -> list[dict | None]:
+        """
+        Проверка пачки access токенов. Вместо исключения для недействительного токена вернет None на его месте.
+        """
+        payloads = []
+        for token in tokens:
+            try:
+                payload = self.verify_access_token(token)
+            except HTTPException:
+                payload = None
+            payloads.append(payload)
+        return payloads
+
     def verify_refresh_token(self, token: str) -> dict:
         payload = self._decode_token(token)
         if payload.get("type") != TypeToken.REFRESH.name:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ошибка аутентификации")
         return payload
 
-    def hashing_token(self, token: str) -> str:
-        try:
-            hash_token = get_hasher().hash(token)
-        except HashingError as exp:
-            logger.error("Хеширование не удалось: {}", exp.args[0])
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Server error")
-        return hash_token
+    async def hashing_token(self, token: str) -> str:
+        return await get_token_digest().hash(token)
 
-    def check_hash_token(self, hash_token: str, token: str) -> bool:
-        try:
-            get_hasher().verify(hash_token, token)
-        except (VerifyMismatchError, VerificationError):
-            return False
-        return True
+    async def check_hash_token(self, hash_token: str, token: str) -> bool:
+        return await verify_token_digest(hash_token, token)
 
 
 app_token = Token()
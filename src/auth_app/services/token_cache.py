@@ -0,0 +1,63 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from src.core.config import settings
+
+
+class VerifiedTokenCache:
+    """
+    Кэш проверенных access токенов в памяти процесса. Ключ - sha256 токена, значение - payload. Запись живет до exp
+    токена, при переполнении вытесняется самая давно использованная (LRU).
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize: int = maxsize
+        self._data: OrderedDict[bytes, dict] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._key(token)
+        payload = self._data.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+
+        if payload["exp"] <= time.time():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: dict) -> None:
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+
+        key = self._key(token)
+        self._data[key] = payload
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return
+
+    def delete(self, token: str) -> None:
+        self._data.pop(self._key(token), None)
+        return
+
+    def clear(self) -> None:
+        self._data.clear()
+        return
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+access_token_cache = VerifiedTokenCache(maxsize=settings.ACCESS_TOKEN_CACHE_SIZE)
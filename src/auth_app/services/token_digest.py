@@ -0,0 +1,92 @@
+import hashlib
+import hmac
+from abc import ABC, abstractmethod
+from functools import cached_property
+
+from argon2.exceptions import VerifyMismatchError, HashingError, VerificationError, InvalidHashError
+from fastapi import HTTPException, status
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.auth_app.services.password import get_hasher, run_hasher
+
+
+class TokenDigest(ABC):
+    """ Способ хранения refresh токена в Redis """
+
+    prefix: str = ""
+
+    @abstractmethod
+    async def hash(self, token: str) -> str:
+        """ Дайджест токена для хранения """
+
+    @abstractmethod
+    async def verify(self, digest: str, token: str) -> bool:
+        """ Сверка токена с сохраненным дайджестом """
+
+    def is_own(self, digest: str) -> bool:
+        return digest.startswith(self.prefix)
+
+
+class HmacTokenDigest(TokenDigest):
+    """
+    HMAC-SHA256 с секретом сервера. Refresh токен - подписанный JWT с высокой энтропией, медленный хеш для него
+    не нужен.
+    """
+
+    prefix = "hmac-sha256$"
+
+    @cached_property
+    def _secret(self) -> bytes:
+        return settings.refresh_token_secret
+
+    def _hmac(self, token: str) -> str:
+        return self.prefix + hmac.new(self._secret, token.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    async def hash(self, token: str) -> str:
+        return self._hmac(token)
+
+    async def verify(self, digest: str, token: str) -> bool:
+        return hmac.compare_digest(digest, self._hmac(token))
+
+
+class Argon2TokenDigest(TokenDigest):
+    """ Argon2, как у паролей, в пуле crypto_executor. Прежний способ хранения """
+
+    prefix = "$argon2"
+
+    async def hash(self, token: str) -> str:
+        try:
+            hash_token = await run_hasher(get_hasher().hash, token)
+        except HashingError as exp:
+            logger.error("Хеширование не удалось: {}", exp.args[0])
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Server error")
+        return hash_token
+
+    async def verify(self, digest: str, token: str) -> bool:
+        try:
+            await run_hasher(get_hasher().verify, digest, token)
+        except (VerifyMismatchError, VerificationError, InvalidHashError):
+            return False
+        return True
+
+
+DIGESTS: dict[str, TokenDigest] = {
+    "hmac": HmacTokenDigest(),
+    "argon2": Argon2TokenDigest(),
+}
+
+
+def get_token_digest() -> TokenDigest:
+    return DIGESTS[settings.REFRESH_TOKEN_DIGEST]
+
+
+async def verify_token_digest(digest: str, token: str) -> bool:
+    """
+    Сверка по способу, которым дайджест был записан. Записи в auth:refresh:* от другого способа (например, Argon2
+    до перехода на HMAC) проверяются своим способом и перезаписываются при выдаче новой пары токенов.
+    """
+    for token_digest in DIGESTS.values():
+        if token_digest.is_own(digest):
+            return await token_digest.verify(digest, token)
+    return False
@@ -4,6 +4,9 @@ from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import RowMapping
 
+from src.core.database import after_commit
+from src.core.redis.principal_cache import principal_cache
+from src.core.redis.token_version import token_versions
 from src.auth_app.exceptions import UserHTTPException
 from src.auth_app.repositories import UserRegisteredRepo
 from src.auth_app.services.base import UserBase
@@ -73,6 +76,8 @@ class CurrentUser(UserBase):
         user_dict: RowMapping = await UserRegisteredRepo.update_one_user_by_id(
             self.current_user.id, data_dict, self.db_session
         )
+        after_commit(self.db_session, principal_cache.invalidate, self.current_user.id)
+        after_commit(self.db_session, token_versions.bump, self.current_user.id)
 
         return user_dict
 
@@ -83,4 +88,6 @@ class CurrentUser(UserBase):
         self._check_attr_user_id()
 
         user_dict: RowMapping = await UserRegisteredRepo.delete_user(self.current_user, self.db_session)
+        after_commit(self.db_session, principal_cache.invalidate, self.current_user.id)
+        after_commit(self.db_session, token_versions.bump, self.current_user.id)
         return user_dict
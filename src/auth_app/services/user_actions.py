@@ -1,13 +1,20 @@
 from typing import TYPE_CHECKING
 
+from fastapi import HTTPException, status
 from sqlalchemy import RowMapping
 
+from src.core.config import settings
+
 from src.core.redis.cache_refresh_token import set_cache_refresh_token, get_cache_refresh_token, \
     delete_cache_refresh_token
 from src.core.redis.cache_decorator import async_set_get_cache
+from src.core.redis.login_throttle import login_throttle
+from src.core.redis.revoked_tokens import revoked_tokens
+from src.core.redis.token_version import token_versions
 from src.auth_app.exceptions import UserHTTPException, AuthHTTPException
 from src.auth_app.schemes.auth_schemes import AuthSchema
 from src.auth_app.schemes.user_schemes import UserWorkSchema, UserUpdateSchema
+from src.auth_app.services.auth import client_ip
 from src.auth_app.services.password import password
 from src.auth_app.services.token import app_token
 
@@ -19,26 +26,41 @@ if TYPE_CHECKING:
 
 class AuthUserActions:
 
-    async def login_user(self, request: "Request", user_input: AuthSchema, db: "AsyncSession") -> tuple[str, str]:
+    @staticmethod
+    async def _get_access_token(user: UserWorkSchema) -> str:
+        """ В stateless режиме access токен содержит данные пользователя и версию токенов """
+        version = await token_versions.get(user.id) if settings.STATELESS_ACCESS_TOKENS else None
+        return app_token.get_access_token(user, version)
 
-        user_instance = await password.verify_password(user_input=user_input, db=db)
+    async def login_user(self, request: "Request", user_input: AuthSchema, db: "AsyncSession") -> tuple[str, str]:
+        rc = request.app.state.redis_client
+        identity: str = user_input.username or user_input.email
+
+        try:
+            user_instance = await password.verify_password(user_input=user_input, db=db)
+        except HTTPException as exp:
+            if exp.status_code == status.HTTP_401_UNAUTHORIZED:
+                await login_throttle.register_failure(rc, identity, client_ip(request))
+            raise
         user = UserWorkSchema(**user_instance.__dict__)
         del user_input
+        await login_throttle.reset(rc, identity)
 
-        access_token: str = app_token.get_access_token(user)
+        access_token: str = await self._get_access_token(user)
         refresh_token: str = app_token.get_refresh_token(user)
-        hash_refresh_token: str = app_token.hashing_token(refresh_token)
+        hash_refresh_token: str = await app_token.hashing_token(refresh_token)
 
-        rc = request.app.state.redis_client
         await set_cache_refresh_token(cln=rc, username=user.username, token=hash_refresh_token)
 
         return access_token, refresh_token
 
     async def logout_user(self, request: "Request") -> bool:
         user = request.state.user.current_user
+        payload: dict = request.state.payload
         rc = request.app.state.redis_client
 
         await delete_cache_refresh_token(cln=rc, username=user.username)
+        await revoked_tokens.revoke(cln=rc, jti=payload["jti"], exp=payload["exp"])
         return True
 
     async def refresh_login(self, request: "Request") -> tuple[str, str]:
@@ -46,12 +68,12 @@ class AuthUserActions:
         rc = request.app.state.redis_client
 
         session_token: str = await get_cache_refresh_token(cln=rc, username=user.username)
-        if not session_token or not app_token.check_hash_token(session_token, request.state.token):
+        if not session_token or not await app_token.check_hash_token(session_token, request.state.token):
             AuthHTTPException.raise_http_403()
 
-        access_token: str = app_token.get_access_token(user)
+        access_token: str = await self._get_access_token(user)
         refresh_token: str = app_token.get_refresh_token(user)
-        hash_refresh_token: str = app_token.hashing_token(refresh_token)
+        hash_refresh_token: str = await app_token.hashing_token(refresh_token)
 
         await set_cache_refresh_token(cln=rc, username=user.username, token=hash_refresh_token)
 
@@ -0,0 +1,76 @@
+import base64
+import binascii
+from datetime import datetime
+from typing import AsyncIterator
+from uuid import UUID
+
+from sqlalchemy import RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal, AsyncReplicaSessionLocal
+from src.auth_app.exceptions import UserHTTPException
+from src.auth_app.repositories.superuser_repository import SuperuserRepo
+from src.auth_app.schemes.user_schemes import UserWorkSchema, UsersAllSchema
+
+
+def encode_cursor(user_map: RowMapping) -> str:
+    """ Непрозрачный курсор страницы: ключ (created, id) последней записи """
+    raw = f"{user_map['created'].isoformat()},{user_map['id']}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, UUID] | None:
+    """ Ключ (created, id) из курсора. Некорректный курсор - HTTP 400 """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created, user_id = raw.split(",", 1)
+        return datetime.fromisoformat(created), UUID(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        UserHTTPException.raise_http_400(detail="Некорректный cursor")
+
+
+class UserListingService:
+    """ Список пользователей для администратора: страницы по ключу (created, id) или поток NDJSON """
+
+    def __init__(self, db: AsyncSession):
+        self.db_session: AsyncSession = db
+
+    async def get_page(self, limit: int, cursor: str | None) -> UsersAllSchema:
+        """
+        Страница пользователей. Читается limit + 1 запись: лишняя показывает, что есть следующая страница.
+        Args:
+            limit: размер страницы
+            cursor: next_cursor предыдущей страницы
+        Returns:
+            UsersAllSchema с next_cursor
+        """
+        rows = await SuperuserRepo.select_users_page(limit + 1, decode_cursor(cursor), self.db_session)
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return UsersAllSchema(
+            users=[UserWorkSchema.model_validate(row) for row in rows[:limit]],
+            next_cursor=next_cursor,
+        )
+
+    @classmethod
+    def stream_ndjson(cls, cursor: str | None) -> AsyncIterator[bytes]:
+        """
+        Все пользователи после cursor, по строке JSON на пользователя, для StreamingResponse. Курсор проверяется
+        сразу, до начала ответа.
+        """
+        return cls._ndjson_chunks(decode_cursor(cursor))
+
+    @staticmethod
+    async def _ndjson_chunks(after: tuple[datetime, UUID] | None) -> AsyncIterator[bytes]:
+        """
+        Генератор отдается после завершения обработчика, когда сеанс запроса уже закрыт, поэтому сеанс свой.
+        Читается с реплики, если она настроена. Одна пачка курсора - один фрагмент ответа.
+        """
+        session_factory = AsyncReplicaSessionLocal or AsyncSessionLocal
+        async with session_factory() as session:
+            async for rows in SuperuserRepo.stream_users(after, settings.USERS_STREAM_BATCH_SIZE, session):
+                yield b"".join(
+                    UserWorkSchema.model_validate(row).model_dump_json().encode("utf-8") + b"\n" for row in rows
+                )
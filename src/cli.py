@@ -1,9 +1,20 @@
 import asyncio
+import sys
+from datetime import timedelta
+from pathlib import Path
+from uuid import UUID
 
 import typer
 from rich import print
+from rich.table import Table
 
+from src.auth_app.commands.bench_statements import benchmark_statements
+from src.auth_app.commands.bench_user_lookup import benchmark_user_lookup
+from src.auth_app.commands.calibrate_argon2 import benchmark_argon2, recommend_argon2, write_env
 from src.auth_app.commands.create_superuser import create_superuser
+from src.auth_app.commands.explain_user_queries import explain_user_queries
+from src.auth_app.commands.export_users import export_users, parse_columns, parse_since
+from src.auth_app.commands.import_users import import_users, detect_format, write_rejected
 
 
 app = typer.Typer()
@@ -20,6 +31,164 @@ def createsuperuser(
     return
 
 
+@app.command(name="calibrate-argon2")
+def calibrate_argon2(
+        target_ms: float = typer.Option(250.0, help="Целевое p95 время хеширования, мс"),
+        max_memory_mib: int = typer.Option(128, help="Потолок памяти на один хеш, MiB"),
+        samples: int = typer.Option(10, min=1, help="Число замеров на точку сетки"),
+        write: bool = typer.Option(False, "--write", help="Записать параметры в .env"),
+        env_file: Path | None = typer.Option(None, help="Файл .env для записи (по умолчанию BASE_DIR/.env)"),
+) -> None:
+    """
+    Подбор параметров Argon2 на текущем хосте под целевое p95 время и потолок памяти. Хеши со старыми
+    параметрами перехешируются при входе пользователей (check_needs_rehash).
+    """
+    measured = benchmark_argon2(target_ms, max_memory_mib, samples)
+
+    table = Table("time_cost", "memory_cost, KiB", "parallelism", "p95, ms")
+    for c in measured:
+        style = "green" if c.p95_ms <= target_ms else "red"
+        table.add_row(str(c.time_cost), str(c.memory_cost), str(c.parallelism), f"[{style}]{c.p95_ms}[/{style}]")
+    print(table)
+
+    best = recommend_argon2(measured, target_ms)
+    if best is None:
+        print(f"[bold red]Нет параметров с p95 <= {target_ms} мс[/bold red]")
+        raise typer.Exit(code=1)
+
+    print(f"[bold green]Рекомендуется: {best.as_env()}, p95 {best.p95_ms} мс[/bold green]")
+    if write:
+        path = write_env(best.as_env(), env_file)
+        print(f"[bold green]Параметры записаны в {path}[/bold green]")
+    return
+
+
+@app.command(name="bench-statements")
+def bench_statements(
+        iterations: int = typer.Option(10000, help="Число повторов каждого замера"),
+) -> None:
+    """
+    Микробенчмарк подготовки запроса read_one_user_by_id (путь каждого аутентифицированного запроса): сборка
+    select на каждый вызов против готового statement с bindparam.
+    """
+    table = Table("Этап", "мкс на вызов")
+    for timing in benchmark_statements(iterations):
+        table.add_row(timing.name, str(timing.per_call_us))
+    print(table)
+    return
+
+
+@app.command(name="bench-user-lookup")
+def bench_user_lookup(
+        user_id: UUID = typer.Argument(..., help="id существующего пользователя"),
+        requests: int = typer.Option(5000, help="Число запросов на каждый путь"),
+        concurrency: int = typer.Option(50, help="Число одновременных запросов"),
+) -> None:
+    """
+    Сравнение read_one_user_by_id через AsyncSession и напрямую через asyncpg (DB_ASYNCPG_FAST_PATH) на
+    настроенной БД.
+    """
+    timings = asyncio.run(benchmark_user_lookup(user_id, requests, concurrency))
+
+    table = Table("Репозиторий", "RPS", "p50, ms", "p95, ms")
+    for timing in timings:
+        table.add_row(timing.name, str(timing.rps), str(timing.p50_ms), str(timing.p95_ms))
+    print(table)
+    return
+
+
+@app.command(name="explain-user-queries")
+def explain_user_queries_command() -> None:
+    """
+    Проверка по EXPLAIN, что каждый запрос репозиториев пользователя использует индекс (по id - первичный ключ,
+    по username/email - индексы lower()). Код выхода 1, если хотя бы один запрос индекс не использует.
+    """
+    results = asyncio.run(explain_user_queries())
+
+    table = Table("Запрос", "Ожидается", "Использован")
+    for result in results:
+        style = "green" if result.ok else "red"
+        table.add_row(
+            result.name,
+            ", ".join(sorted(result.expected)),
+            f"[{style}]{', '.join(sorted(result.used)) or '-'}[/{style}]",
+        )
+    print(table)
+
+    if not all(result.ok for result in results):
+        raise typer.Exit(code=1)
+    return
+
+
+@app.command(name="import-users")
+def import_users_command(
+        path: Path | None = typer.Argument(None, help="CSV или NDJSON файл, без аргумента - stdin"),
+        fmt: str | None = typer.Option(None, "--format", help="csv или ndjson, по умолчанию по расширению файла"),
+        batch_size: int = typer.Option(1000, help="Строк в пачке (одна транзакция на пачку)"),
+        workers: int = typer.Option(0, help="Процессов для хеширования паролей, 0 - по числу ядер"),
+        report: Path | None = typer.Option(None, help="CSV-отчет об отклоненных строках"),
+) -> None:
+    """
+    Импорт пользователей: поля username, email, password (открытым текстом), необязательные first_name,
+    second_name, last_name. Пароли хешируются в пуле процессов, пачки загружаются через COPY. Строки с
+    занятыми username/email не вставляются и попадают в отчет.
+    """
+    if fmt not in (None, "csv", "ndjson"):
+        raise typer.BadParameter("csv или ndjson", param_hint="--format")
+
+    stats = asyncio.run(import_users(path, fmt or detect_format(path), batch_size, workers))
+
+    table = Table("Строк", "Вставлено", "Отклонено", "Хеширование, с", "Всего, с", "Строк/с")
+    table.add_row(
+        str(stats.total), str(stats.inserted), str(len(stats.rejected)),
+        str(round(stats.hashing_seconds, 2)), str(round(stats.elapsed_seconds, 2)), str(stats.rows_per_second),
+    )
+    print(table)
+
+    if report is not None and stats.rejected:
+        write_rejected(stats.rejected, report)
+        print(f"[bold yellow]Отклоненные строки записаны в {report}[/bold yellow]")
+    return
+
+
+@app.command(name="export-users")
+def export_users_command(
+        path: Path | None = typer.Argument(None, help="Файл выгрузки, без аргумента - stdout"),
+        fmt: str = typer.Option("csv", "--format", help="csv или parquet (нужен pyarrow)"),
+        columns: str | None = typer.Option(None, help="Столбцы через запятую, по умолчанию все, кроме password"),
+        since: str | None = typer.Option(None, help="Водяной знак (ISO 8601): только строки с updated > since"),
+        overlap: float = typer.Option(
+            60.0, help="Перекрытие с прошлой выгрузкой, с: строки updated > since - overlap, повторы схлопывать по id"
+        ),
+        batch_size: int = typer.Option(5000, help="Строк в пачке курсора"),
+) -> None:
+    """
+    Выгрузка пользователей в CSV или Parquet курсором на сервере БД, с постоянным расходом памяти. Для
+    инкрементальной выгрузки новый водяной знак выводится в stderr - его передают в --since следующего запуска
+    без изменений. Окно --overlap покрывает транзакции, начатые до прошлой выгрузки и зафиксированные после нее.
+    """
+    if fmt not in ("csv", "parquet"):
+        raise typer.BadParameter("csv или parquet", param_hint="--format")
+    try:
+        names = parse_columns(columns)
+    except ValueError as exp:
+        raise typer.BadParameter(str(exp), param_hint="--columns")
+    try:
+        since_watermark = parse_since(since)
+    except ValueError as exp:
+        raise typer.BadParameter(str(exp), param_hint="--since")
+
+    try:
+        stats = asyncio.run(export_users(path, fmt, names, since_watermark, batch_size, timedelta(seconds=overlap)))
+    except RuntimeError as exp:
+        print(f"[bold red]{exp}[/bold red]", file=sys.stderr)
+        raise typer.Exit(code=1)
+
+    watermark = stats.watermark.isoformat() if stats.watermark else "-"
+    print(f"[bold green]Выгружено строк: {stats.rows}, водяной знак: {watermark}[/bold green]", file=sys.stderr)
+    return
+
+
 @app.command()
 def hello():
     print(f"[bold green]Привет! Это пробное приложение![/bold green]")
@@ -0,0 +1,87 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+
+class AdmissionRejected(Exception):
+    """ Запрос не успеет выполниться за отведенное время """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Превышен лимит одновременных запросов")
+        self.retry_after: int = retry_after
+
+
+class AdmissionController:
+    """
+    Ограничение числа одновременно выполняемых CPU-тяжелых запросов в воркере. Сверх limit запросы ждут в очереди
+    не дольше deadline. Если по средней длительности запроса ожидание заведомо превысит deadline, запрос
+    отклоняется сразу.
+    """
+
+    def __init__(self, limit: int, deadline: float):
+        self.limit: int = limit
+        self.deadline: float = deadline
+        self._semaphore: asyncio.Semaphore | None = None
+        self._service_time: float = 0.0
+        self.in_flight: int = 0
+        self.waiting: int = 0
+        self.accepted: int = 0
+        self.queued: int = 0
+        self.rejected: int = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        return self._semaphore
+
+    def _expected_wait(self) -> float:
+        """ Оценка ожидания нового запроса в очереди, с """
+        return (self.waiting // self.limit + 1) * self._service_time
+
+    def _reject(self) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(retry_after=max(1, math.ceil(self._expected_wait())))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        semaphore = self.semaphore
+        if semaphore.locked():
+            if self._expected_wait() > self.deadline:
+                raise self._reject()
+
+            self.queued += 1
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.deadline)
+            except TimeoutError:
+                raise self._reject()
+            finally:
+                self.waiting -= 1
+        else:
+            await semaphore.acquire()
+
+        self.accepted += 1
+        self.in_flight += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self._service_time = elapsed if not self._service_time else 0.8 * self._service_time + 0.2 * elapsed
+            self.in_flight -= 1
+            semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "deadline_ms": round(self.deadline * 1000),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "accepted": self.accepted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "service_time_ms": round(self._service_time * 1000, 3),
+        }
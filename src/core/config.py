@@ -1,4 +1,6 @@
+import hashlib
 from pathlib import Path
+from typing import Literal
 
 from cryptography.hazmat.primitives import serialization
 from pydantic import Field
@@ -17,6 +19,19 @@ class Settings(BaseSettings, case_sensitive=True):
     DB_HOST: str = Field(alias="DB_HOST")
     DB_PORT: str = Field(alias="DB_PORT")
     ECHO: bool = Field(alias="ECHO")
+    DB_POOL_SIZE: int = Field(default=5, alias="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    DB_POOL_RECYCLE: int = Field(default=-1, alias="DB_POOL_RECYCLE")
+    DB_POOL_PRE_PING: bool = Field(default=False, alias="DB_POOL_PRE_PING")
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = Field(default=100, alias="DB_PREPARED_STATEMENT_CACHE_SIZE")
+    DB_REPLICA_HOST: str | None = Field(default=None, alias="DB_REPLICA_HOST")
+    DB_REPLICA_PORT: str | None = Field(default=None, alias="DB_REPLICA_PORT")
+    DB_REPLICA_STICKY_SECONDS: int = Field(default=5, alias="DB_REPLICA_STICKY_SECONDS")
+    DB_PGBOUNCER: bool = Field(default=False, alias="DB_PGBOUNCER")
+    DB_PGBOUNCER_LOCAL_POOL_SIZE: int = Field(default=0, alias="DB_PGBOUNCER_LOCAL_POOL_SIZE")
+    DB_ASYNCPG_FAST_PATH: bool = Field(default=False, alias="DB_ASYNCPG_FAST_PATH")
+    USERS_STREAM_BATCH_SIZE: int = Field(default=1000, alias="USERS_STREAM_BATCH_SIZE")
 
     # auth
     PASSWORD: str = Field(alias="PASSWORD")
@@ -25,6 +40,27 @@ class Settings(BaseSettings, case_sensitive=True):
     PUBLIC_KEY: str = Field(alias="PUBLIC_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(alias="ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_HOURS: int = Field(alias="REFRESH_TOKEN_EXPIRE_HOURS")
+    REFRESH_TOKEN_DIGEST: Literal["hmac", "argon2"] = Field(default="hmac", alias="REFRESH_TOKEN_DIGEST")
+    REFRESH_TOKEN_SECRET_FILE: str | None = Field(default=None, alias="REFRESH_TOKEN_SECRET_FILE")
+    STATELESS_ACCESS_TOKENS: bool = Field(default=False, alias="STATELESS_ACCESS_TOKENS")
+    TOKEN_VERSION_LOCAL_TTL_SECONDS: int = Field(default=5, alias="TOKEN_VERSION_LOCAL_TTL_SECONDS")
+    TOKEN_VERSION_LOCAL_CACHE_SIZE: int = Field(default=10000, alias="TOKEN_VERSION_LOCAL_CACHE_SIZE")
+    RETIRED_PUBLIC_KEYS: list[str] = Field(default_factory=list, alias="RETIRED_PUBLIC_KEYS")
+    KEYS_RELOAD_SECONDS: int = Field(default=60, alias="KEYS_RELOAD_SECONDS")
+    JWKS_MAX_AGE_SECONDS: int = Field(default=3600, alias="JWKS_MAX_AGE_SECONDS")
+    ACCESS_TOKEN_CACHE_SIZE: int = Field(default=10000, alias="ACCESS_TOKEN_CACHE_SIZE")
+
+    # argon2 (параметры подбираются командой calibrate-argon2)
+    ARGON2_TIME_COST: int = Field(default=3, alias="ARGON2_TIME_COST")
+    ARGON2_MEMORY_COST: int = Field(default=65536, alias="ARGON2_MEMORY_COST")
+    ARGON2_PARALLELISM: int = Field(default=4, alias="ARGON2_PARALLELISM")
+
+    # crypto executor
+    CRYPTO_EXECUTOR: Literal["thread", "process"] = Field(default="thread", alias="CRYPTO_EXECUTOR")
+    CRYPTO_WORKERS: int = Field(default=0, alias="CRYPTO_WORKERS")
+    CRYPTO_MAX_QUEUE: int = Field(default=256, alias="CRYPTO_MAX_QUEUE")
+    ADMISSION_CRYPTO_LIMIT: int = Field(default=0, alias="ADMISSION_CRYPTO_LIMIT")
+    ADMISSION_DEADLINE_MS: int = Field(default=2000, alias="ADMISSION_DEADLINE_MS")
 
     # App
     APPLICATION: str = Field(alias="APPLICATION")
@@ -36,6 +72,16 @@ class Settings(BaseSettings, case_sensitive=True):
     REDIS_HOST: str = Field(alias="REDIS_HOST")
     REDIS_PORT: int = Field(alias="REDIS_PORT")
     REDIS_PASS_FILE: str = Field(alias="REDIS_PASS_FILE")
+    REVOKED_BLOOM_CAPACITY: int = Field(default=100000, alias="REVOKED_BLOOM_CAPACITY")
+    REVOKED_BLOOM_ERROR_RATE: float = Field(default=0.001, alias="REVOKED_BLOOM_ERROR_RATE")
+    REVOKED_SYNC_SECONDS: int = Field(default=5, alias="REVOKED_SYNC_SECONDS")
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = Field(default=900, alias="LOGIN_THROTTLE_WINDOW_SECONDS")
+    LOGIN_THROTTLE_USER_LIMIT: int = Field(default=10, alias="LOGIN_THROTTLE_USER_LIMIT")
+    LOGIN_THROTTLE_IP_LIMIT: int = Field(default=100, alias="LOGIN_THROTTLE_IP_LIMIT")
+    TRUSTED_PROXIES: list[str] = Field(default_factory=list, alias="TRUSTED_PROXIES")
+    PRINCIPAL_LOCAL_CACHE_SIZE: int = Field(default=10000, alias="PRINCIPAL_LOCAL_CACHE_SIZE")
+    PRINCIPAL_LOCAL_TTL_SECONDS: int = Field(default=5, alias="PRINCIPAL_LOCAL_TTL_SECONDS")
+    PRINCIPAL_CACHE_TTL_SECONDS: int = Field(default=300, alias="PRINCIPAL_CACHE_TTL_SECONDS")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -54,9 +100,21 @@ class Settings(BaseSettings, case_sensitive=True):
         db_pass = self._get_db_pass()
         return f"postgresql+asyncpg://{self.DB_USER}:{db_pass}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    @property
+    def async_replica_postgresql_url(self) -> str | None:
+        if not self.DB_REPLICA_HOST:
+            return None
+        db_pass = self._get_db_pass()
+        port = self.DB_REPLICA_PORT or self.DB_PORT
+        return f"postgresql+asyncpg://{self.DB_USER}:{db_pass}@{self.DB_REPLICA_HOST}:{port}/{self.DB_NAME}"
+
     @property
     def public_key(self):
-        with open(BASE_DIR / self.PUBLIC_KEY, "rb") as f:
+        return self.read_public_key(self.PUBLIC_KEY)
+
+    @staticmethod
+    def read_public_key(path: str) -> bytes:
+        with open(BASE_DIR / path, "rb") as f:
             key = f.read()
         return key
 
@@ -74,6 +132,16 @@ class Settings(BaseSettings, case_sensitive=True):
         )
         return private_key
 
+    @property
+    def refresh_token_secret(self) -> bytes:
+        """ Секрет HMAC для refresh токенов. Если файл не задан - производный от пароля приватного ключа """
+        path = self.REFRESH_TOKEN_SECRET_FILE or self.PASSWORD
+        with open(BASE_DIR / path, "rb") as f:
+            secret = f.read()
+        if self.REFRESH_TOKEN_SECRET_FILE is None:
+            secret = hashlib.sha256(b"refresh-token-digest:" + secret).digest()
+        return secret
+
     @property
     def redis_pass(self) -> str:
         with open(BASE_DIR / self.REDIS_PASS_FILE, "r") as f:
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Any
+
+from src.core.config import settings
+from src.core.logger import logger
+
+
+class CryptoExecutorBusy(Exception):
+    """ Очередь пула переполнена """
+
+
+def _timed_call(func: Callable, args: tuple, submitted: float) -> tuple[Any, float]:
+    """ Выполняется в пуле. Вернет результат и время ожидания в очереди """
+    wait = time.monotonic() - submitted
+    return func(*args), wait
+
+
+class CryptoExecutor:
+    """
+    Пул для CPU-тяжелых операций (Argon2), чтобы не блокировать цикл событий. Пул потоков или процессов
+    (CRYPTO_EXECUTOR), размер - CRYPTO_WORKERS или число ядер. Очередь ограничена CRYPTO_MAX_QUEUE, сверх нее
+    вызов отклоняется с CryptoExecutorBusy.
+    """
+
+    def __init__(self):
+        self._executor: Executor | None = None
+        self.workers: int = settings.CRYPTO_WORKERS or os.cpu_count() or 1
+        self.max_queue: int = settings.CRYPTO_MAX_QUEUE
+        self.pending: int = 0
+        self.completed: int = 0
+        self.rejected: int = 0
+        self.wait_total: float = 0.0
+        self.wait_max: float = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if settings.CRYPTO_EXECUTOR == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="crypto")
+            logger.info("Пул для хеширования: {}, воркеров {}", settings.CRYPTO_EXECUTOR, self.workers)
+        return self._executor
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.pending - self.workers)
+
+    async def run(self, func: Callable, *args) -> Any:
+        """ Выполняет func(*args) в пуле """
+
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            raise CryptoExecutorBusy("Очередь пула хеширования переполнена")
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            result, wait = await loop.run_in_executor(self._get_executor(), _timed_call, func, args, time.monotonic())
+        finally:
+            self.pending -= 1
+
+        self.completed += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "executor": settings.CRYPTO_EXECUTOR,
+            "workers": self.workers,
+            "in_flight": self.pending - self.queue_depth,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(self.wait_total / self.completed * 1000, 3) if self.completed else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        return
+
+
+crypto_executor = CryptoExecutor()
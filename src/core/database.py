@@ -1,17 +1,73 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, Awaitable, Callable, Sequence
+from uuid import uuid4
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from fastapi import Request
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from src.core.config import settings
+from src.core.db_pool import MeteredAsyncQueuePool
+from src.core.redis.replica_sticky import replica_sticky
 
 
 DATABASE_URL = settings.postgresql_url
 ASYNC_DATABASE_URL = settings.async_postgresql_url
+ASYNC_REPLICA_DATABASE_URL = settings.async_replica_postgresql_url
+
+
+def _pgbouncer_statement_name() -> str:
+    """ Уникальное имя prepared statement: за PgBouncer соединение с сервером меняется между транзакциями """
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def create_app_async_engine(url: str) -> AsyncEngine:
+    """
+    Async engine по настройкам пула. С DB_PGBOUNCER - режим для PgBouncer (pool_mode=transaction): NullPool или
+    небольшой локальный пул (DB_PGBOUNCER_LOCAL_POOL_SIZE), без кэша prepared statements, с уникальными именами
+    statements, без состояния на уровне сеанса сервера.
+    """
+    if not settings.DB_PGBOUNCER:
+        return create_async_engine(
+            make_url(url).update_query_dict(
+                {"prepared_statement_cache_size": str(settings.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+            ),
+            echo=settings.ECHO,
+            poolclass=MeteredAsyncQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+        )
+
+    pool_kwargs: dict = {"poolclass": NullPool}
+    if settings.DB_PGBOUNCER_LOCAL_POOL_SIZE > 0:
+        pool_kwargs = {
+            "poolclass": MeteredAsyncQueuePool,
+            "pool_size": settings.DB_PGBOUNCER_LOCAL_POOL_SIZE,
+            "max_overflow": 0,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+
+    return create_async_engine(
+        make_url(url).update_query_dict({"prepared_statement_cache_size": "0"}),
+        echo=settings.ECHO,
+        connect_args={
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": _pgbouncer_statement_name,
+        },
+        **pool_kwargs,
+    )
+
 
 engine = create_engine(DATABASE_URL, echo=settings.ECHO)
-async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=settings.ECHO)
+async_engine = create_app_async_engine(ASYNC_DATABASE_URL)
+async_replica_engine = create_app_async_engine(ASYNC_REPLICA_DATABASE_URL) if ASYNC_REPLICA_DATABASE_URL else None
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -27,6 +83,14 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+) if async_replica_engine is not None else None
+
 
 # Dependency
 def get_db():
@@ -41,16 +105,133 @@ def get_db():
         db.close()
 
 
-async def get_async_db() -> AsyncGenerator[AsyncSession, any]:
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, any]:
     """
-    Асинхронный независимый сеанс/соединение с базой данных (SessionLocal).
+    Асинхронный сеанс с базой данных, один на запрос для всех зависимостей (request.state.db). Соединение из пула
+    берется только при первом запросе к БД и возвращается после чтения (release_connection) или commit.
+    Запрос - единица работы (unit_of_work): репозитории только выполняют запросы в транзакции, фиксация одна,
+    после обработчика, при исключении - откат. Объявлять как Depends(get_async_db, scope="function"): тогда commit
+    и функции after_commit выполняются до отправки ответа, а ошибка фиксации доходит до клиента (HTTP 500).
+    Со scope="request" (по умолчанию для зависимостей с yield) commit был бы уже после ответа.
     """
+    session: AsyncSession | None = getattr(request.state, "db", None)
+    if session is not None:
+        yield session
+        return
+
     async with AsyncSessionLocal() as session:
+        request.state.db = session
         try:
-            yield session
+            async with unit_of_work(session):
+                yield session
         finally:
             await session.close()
 
 
+# Ключ session.info: в транзакции есть незафиксированные изменения, соединение отпускать нельзя
+PIN_CONNECTION = "pin_connection"
+
+
+# Ключ session.info: в сеансе была запись, чтение в этом запросе - только с основного сервера
+WROTE = "wrote"
+
+# Ключ session.info: функции, которые выполнятся после фиксации транзакции (after_commit)
+AFTER_COMMIT = "after_commit"
+
+
+async def release_connection(db: AsyncSession) -> None:
+    """
+    Возвращает соединение сеанса в пул после чтения, не дожидаясь конца запроса. Сеанс остается пригодным для
+    следующих запросов, загруженные объекты становятся detached.
+    """
+    if db.in_transaction() and not (db.new or db.dirty or db.deleted) and not db.info.get(PIN_CONNECTION):
+        await db.close()
+    return
+
+
+def mark_uncommitted(db: AsyncSession) -> None:
+    """ В транзакции сеанса есть незафиксированная запись: соединение держится до commit/rollback """
+    db.info[PIN_CONNECTION] = True
+    return
+
+
+def after_commit(db: AsyncSession, func: Callable[..., Awaitable], *args) -> None:
+    """
+    Откладывает await func(*args) до фиксации транзакции (сброс кэшей и т.п.), чтобы другие запросы не успели
+    закэшировать данные, которые еще не зафиксированы. При откате функции не вызываются.
+    """
+    db.info.setdefault(AFTER_COMMIT, []).append((func, args))
+    return
+
+
+@asynccontextmanager
+async def unit_of_work(db: AsyncSession) -> AsyncGenerator[AsyncSession, any]:
+    """
+    Единица работы: все записи внутри блока фиксируются одним commit при выходе, при исключении - rollback.
+    Вложенные шаги, ошибка которых не должна отменять всю работу, оборачиваются в db.begin_nested() (SAVEPOINT).
+    """
+    try:
+        yield db
+    except BaseException:
+        db.info.pop(AFTER_COMMIT, None)
+        await db.rollback()
+        raise
+    else:
+        if db.in_transaction():
+            await db.commit()
+    finally:
+        db.info.pop(PIN_CONNECTION, None)
+
+    for func, args in db.info.pop(AFTER_COMMIT, []):
+        await func(*args)
+    return
+
+
+class ReplicaRouter:
+    """
+    Выбор сервера для чтения. Чтение идет на реплику (DB_REPLICA_HOST), кроме случаев: в сеансе уже была запись
+    (WROTE, PIN_CONNECTION), либо читаются данные пользователя, измененного за последние
+    DB_REPLICA_STICKY_SECONDS (read-your-writes). Отметки об изменении - по id измененного пользователя в Redis
+    (replica_sticky), общие для всех воркеров; если Redis недоступен, чтение пользователя идет с основного сервера.
+    Чтение для аутентификации и проверки пароля реплику не использует (см. UserBaseRepo._execute_read).
+    """
+
+    @property
+    def enabled(self) -> bool:
+        return AsyncReplicaSessionLocal is not None
+
+    def mark_write(self, db: AsyncSession, user_ids: Sequence[Any] = ()) -> None:
+        """ Запись в сеансе; измененные пользователи отмечаются после фиксации транзакции """
+        db.info[WROTE] = True
+        if self.enabled and user_ids:
+            after_commit(db, replica_sticky.mark, *user_ids)
+        return
+
+    async def use_replica(self, db: AsyncSession, user_ids: Sequence[Any] = ()) -> bool:
+        if not self.enabled or db.info.get(WROTE) or db.info.get(PIN_CONNECTION):
+            return False
+        if user_ids and await replica_sticky.is_sticky(*user_ids) is not False:
+            return False
+        return True
+
+
+replica_router = ReplicaRouter()
+
+
+def _pool_stats(engine_: AsyncEngine) -> dict:
+    pool = engine_.pool
+    if isinstance(pool, MeteredAsyncQueuePool):
+        return pool.stats()
+    return {"pool": pool.status()}
+
+
+def pool_stats() -> dict:
+    """ Состояние пулов соединений (основной сервер и реплика) в текущем воркере """
+    stats = _pool_stats(async_engine)
+    if async_replica_engine is not None:
+        stats["replica"] = _pool_stats(async_replica_engine)
+    return stats
+
+
 class Base(DeclarativeBase):
     pass
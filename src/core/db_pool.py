@@ -0,0 +1,48 @@
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class MeteredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений с учетом ожиданий: сколько раз запрос ждал свободное соединение (пул и overflow исчерпаны),
+    сколько ждал и сколько раз не дождался (pool_timeout).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count: int = 0
+        self.wait_time: float = 0.0
+        self.wait_max: float = 0.0
+        self.timeouts: int = 0
+
+    def _do_get(self):
+        must_wait = -1 < self._max_overflow <= self._overflow and self._pool.empty()
+        if not must_wait:
+            return super()._do_get()
+
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_time += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "wait_count": self.wait_count,
+            "wait_time_ms": round(self.wait_time * 1000, 3),
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+            "timeouts": self.timeouts,
+        }
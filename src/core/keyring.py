@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+
+from src.core.config import settings, BASE_DIR
+from src.core.logger import logger
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    kid: str
+    key: Any
+    jwk: dict
+
+
+def key_thumbprint(jwk: dict) -> str:
+    """ Идентификатор ключа (kid) - JWK thumbprint по RFC 7638 """
+
+    required = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}
+    members = {name: jwk[name] for name in required[jwk["kty"]]}
+    raw = json.dumps(members, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(hashlib.sha256(raw).digest()).rstrip(b"=").decode("ascii")
+
+
+class KeyRing:
+    """
+    Ключи подписи и проверки JWT в памяти. Файлы ключей читаются и разбираются один раз, повторно - только если
+    файлы изменились на диске (проверка не чаще, чем раз в KEYS_RELOAD_SECONDS). Токен подписывается активным
+    ключом (PRIVATE_KEY), проверяется любым из PUBLIC_KEY и RETIRED_PUBLIC_KEYS по заголовку kid.
+    """
+
+    def __init__(self):
+        self._signing_kid: str | None = None
+        self._signing_key: Any = None
+        self._verification: dict[str, VerificationKey] = {}
+        self._mtimes: dict[str, int] = {}
+        self._checked_at: float = 0.0
+        self.generation: int = 0
+
+    @staticmethod
+    def _files() -> list[str]:
+        return [settings.PRIVATE_KEY, settings.PASSWORD, settings.PUBLIC_KEY, *settings.RETIRED_PUBLIC_KEYS]
+
+    def _get_mtimes(self) -> dict[str, int]:
+        return {path: os.stat(BASE_DIR / path).st_mtime_ns for path in self._files()}
+
+    @staticmethod
+    def _verification_key(public_key: Any) -> VerificationKey:
+        jwk: dict = jwt.get_algorithm_by_name(settings.ALGORITHM).to_jwk(public_key, as_dict=True)
+        kid = key_thumbprint(jwk)
+        jwk.pop("key_ops", None)  # вместе с "use" не указывается (RFC 7517)
+        jwk.update(kid=kid, use="sig", alg=settings.ALGORITHM)
+        return VerificationKey(kid=kid, key=public_key, jwk=jwk)
+
+    def load(self) -> None:
+        """ Читает и разбирает все ключи с диска """
+
+        mtimes = self._get_mtimes()
+        private_key = settings.private_key
+        signing = self._verification_key(private_key.public_key())
+
+        verification: dict[str, VerificationKey] = {signing.kid: signing}
+        for path in [settings.PUBLIC_KEY, *settings.RETIRED_PUBLIC_KEYS]:
+            public_key = serialization.load_pem_public_key(settings.read_public_key(path))
+            key = self._verification_key(public_key)
+            verification.setdefault(key.kid, key)
+
+        self._signing_kid, self._signing_key = signing.kid, private_key
+        self._verification = verification
+        self._mtimes = mtimes
+        self._checked_at = time.monotonic()
+        self.generation += 1
+        logger.info("Ключи JWT загружены, активный kid {}, ключей проверки {}", signing.kid, len(verification))
+        return
+
+    def _refresh(self) -> None:
+        """ Перечитывает ключи, если файлы изменились. Ошибку чтения логирует и оставляет прежние ключи """
+
+        if self._signing_key is None:
+            self.load()
+            return
+
+        now = time.monotonic()
+        if now - self._checked_at < settings.KEYS_RELOAD_SECONDS:
+            return
+
+        self._checked_at = now
+        try:
+            if self._get_mtimes() != self._mtimes:
+                self.load()
+        except (OSError, ValueError, TypeError) as exp:
+            logger.error("Не удалось перечитать ключи JWT: {}", exp)
+        return
+
+    @property
+    def signing_key(self) -> tuple[str, Any]:
+        """ (kid, private key) активного ключа подписи """
+        self._refresh()
+        return self._signing_kid, self._signing_key
+
+    def get_verification_key(self, kid: str | None) -> Any | None:
+        """
+        Ключ проверки подписи по kid. Токены без kid (выпущенные до ротации) проверяются активным ключом.
+        Вернет None для неизвестного kid.
+        """
+        self._refresh()
+        if kid is None:
+            kid = self._signing_kid
+
+        key = self._verification.get(kid)
+        return key.key if key else None
+
+    @property
+    def verification_keys(self) -> list[VerificationKey]:
+        self._refresh()
+        return list(self._verification.values())
+
+
+keyring = KeyRing()
@@ -1,8 +1,12 @@
+import asyncio
 from typing import TYPE_CHECKING
 from contextlib import asynccontextmanager
 
+from src.core.crypto_executor import crypto_executor
+from src.core.keyring import keyring
 from src.core.redis.redis import connect_init, check_redis_client
 from src.core.redis.cache_decorator import set_redis_client_cache
+from src.core.redis.revoked_tokens import revoked_tokens
 
 if TYPE_CHECKING:
     from fastapi import FastAPI
@@ -11,10 +15,14 @@ if TYPE_CHECKING:
 
 @asynccontextmanager
 async def lifespan(app: "FastAPI"):
+    keyring.load()
     client_redis: "Redis" = connect_init()
     await check_redis_client(client_redis)
     app.state.redis_client = client_redis
     set_redis_client_cache(client_redis)
+    revoked_sync = asyncio.create_task(revoked_tokens.run_sync(client_redis))
     yield
 
+    revoked_sync.cancel()
+    crypto_executor.shutdown()
     await client_redis.aclose()
@@ -0,0 +1,110 @@
+import socket
+import time
+from uuid import uuid4
+
+from redis.asyncio import Redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis.redis import RedisUserScope
+
+
+# KEYS: ключи окон (user[, ip]); ARGV: now, window, лимит для каждого ключа. Вернет секунды до разблокировки или 0
+CHECK_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local retry = 0
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    local limit = tonumber(ARGV[2 + i])
+    local count = redis.call('ZCARD', key)
+    if count >= limit then
+        local edge = redis.call('ZRANGE', key, count - limit, count - limit, 'WITHSCORES')
+        local wait = math.ceil(tonumber(edge[2]) + window - now)
+        if wait > retry then
+            retry = wait
+        end
+    end
+end
+return retry
+"""
+
+# KEYS: ключи окон; ARGV: now, window, уникальный member
+FAILURE_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('EXPIRE', key, window)
+end
+return 1
+"""
+
+
+class LoginThrottle:
+    """
+    Ограничение неудачных попыток входа по пользователю (username/email) и IP клиента. Скользящее окно на sorted
+    set в Redis (область "auth:throttle:"), проверка - один Lua скрипт. При недоступности Redis не блокирует.
+    IP None (адрес клиента за прокси не определен) - только ограничение по пользователю.
+    """
+
+    def __init__(self):
+        self._client: Redis | None = None
+        self._check: AsyncScript | None = None
+        self._failure: AsyncScript | None = None
+
+    def _scripts(self, cln: Redis) -> tuple[AsyncScript, AsyncScript]:
+        if self._client is not cln:
+            self._client = cln
+            self._check = cln.register_script(CHECK_LUA)
+            self._failure = cln.register_script(FAILURE_LUA)
+        return self._check, self._failure
+
+    @staticmethod
+    def _user_key(identity: str) -> str:
+        return RedisUserScope.throttle + "user:" + identity.lower()
+
+    def _keys(self, identity: str, ip: str | None) -> list[str]:
+        if ip is None:
+            return [self._user_key(identity)]
+        return [self._user_key(identity), RedisUserScope.throttle + "ip:" + ip]
+
+    async def retry_after(self, cln: Redis, identity: str, ip: str | None) -> int:
+        """ Вернет секунды до разблокировки или 0, если попытка разрешена """
+
+        check, _ = self._scripts(cln)
+        args = [
+            time.time(),
+            settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+            settings.LOGIN_THROTTLE_USER_LIMIT,
+            settings.LOGIN_THROTTLE_IP_LIMIT,
+        ]
+        try:
+            result = await check(keys=self._keys(identity, ip), args=args)
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка проверки попыток входа в Redis: {}", str(e))
+            return 0
+        return int(result)
+
+    async def register_failure(self, cln: Redis, identity: str, ip: str | None) -> None:
+        _, failure = self._scripts(cln)
+        args = [time.time(), settings.LOGIN_THROTTLE_WINDOW_SECONDS, uuid4().hex]
+        try:
+            await failure(keys=self._keys(identity, ip), args=args)
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка записи в Redis: {}", str(e))
+        return
+
+    async def reset(self, cln: Redis, identity: str) -> None:
+        """ Успешный вход сбрасывает счетчик пользователя (счетчик IP остается) """
+
+        try:
+            await cln.delete(self._user_key(identity))
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка удаления записи Redis: {}", str(e))
+        return
+
+
+login_throttle = LoginThrottle()
@@ -0,0 +1,115 @@
+import json
+import socket
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis.cache_decorator import app_redis, default_serializer
+from src.core.redis.redis import RedisUserScope
+
+
+class PrincipalCache:
+    """
+    Кэш данных пользователя для аутентификации по uid. Два уровня: LRU в памяти воркера с коротким сроком
+    (PRINCIPAL_LOCAL_TTL_SECONDS), за ним Redis (область "auth:principal:", PRINCIPAL_CACHE_TTL_SECONDS).
+    Сбрасывается явно при изменении, удалении пользователя и смене пароля, другие воркеры увидят изменение не
+    позже, чем через PRINCIPAL_LOCAL_TTL_SECONDS.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize: int = maxsize
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self.local_hits: int = 0
+        self.redis_hits: int = 0
+        self.misses: int = 0
+
+    def _get_local(self, uid: str) -> dict | None:
+        item = self._local.get(uid)
+        if item is None:
+            return None
+
+        expires, user = item
+        if expires <= time.monotonic():
+            del self._local[uid]
+            return None
+
+        self._local.move_to_end(uid)
+        return user
+
+    def _set_local(self, uid: str, user: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        self._local[uid] = (time.monotonic() + settings.PRINCIPAL_LOCAL_TTL_SECONDS, user)
+        self._local.move_to_end(uid)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+        return
+
+    async def get(self, uid: Any) -> dict | None:
+        uid = str(uid)
+        user = self._get_local(uid)
+        if user is not None:
+            self.local_hits += 1
+            return user
+
+        rc = app_redis.redis_client
+        if rc is not None:
+            try:
+                result = await rc.get(RedisUserScope.principal + uid)
+            except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+                logger.error("Ошибка чтения Redis: {}", str(e))
+            else:
+                if result is not None:
+                    user = json.loads(result)
+                    self._set_local(uid, user)
+                    self.redis_hits += 1
+                    return user
+
+        self.misses += 1
+        return None
+
+    async def set(self, uid: Any, user: dict) -> None:
+        uid = str(uid)
+        user = json.loads(json.dumps(user, default=default_serializer))
+        self._set_local(uid, user)
+
+        rc = app_redis.redis_client
+        if rc is None:
+            return
+        try:
+            await rc.set(RedisUserScope.principal + uid, json.dumps(user), ex=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка записи в Redis: {}", str(e))
+        return
+
+    async def invalidate(self, *uids: Any) -> None:
+        keys = [str(uid) for uid in uids if uid is not None]
+        if not keys:
+            return
+        for uid in keys:
+            self._local.pop(uid, None)
+
+        rc = app_redis.redis_client
+        if rc is None:
+            return
+        try:
+            await rc.delete(*[RedisUserScope.principal + uid for uid in keys])
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка удаления записи Redis: {}", str(e))
+        return
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._local),
+            "maxsize": self.maxsize,
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+        }
+
+
+principal_cache = PrincipalCache(maxsize=settings.PRINCIPAL_LOCAL_CACHE_SIZE)
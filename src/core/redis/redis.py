@@ -17,6 +17,11 @@ redis_user_ctx: ContextVar[str | None] = ContextVar("user_for_key_redis", defaul
 class RedisUserScope(StrEnum):
     cache = "cache:"
     refresh = "auth:refresh:"
+    revoked = "auth:revoked:"
+    throttle = "auth:throttle:"
+    principal = "auth:principal:"
+    token_version = "auth:token_version:"
+    replica_sticky = "auth:replica_sticky:"
     queue = "queue:"
 
 
@@ -0,0 +1,51 @@
+import socket
+from typing import Any
+
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis.cache_decorator import app_redis
+from src.core.redis.redis import RedisUserScope
+
+
+class ReplicaSticky:
+    """
+    Пользователи, данные которых изменены за последние DB_REPLICA_STICKY_SECONDS (область "auth:replica_sticky:",
+    ключ - id пользователя). Общие для всех воркеров: пока реплика может отставать, данные этих пользователей
+    читаются с основного сервера (read-your-writes).
+    """
+
+    async def mark(self, *uids: Any) -> None:
+        """ Отмечает измененных пользователей одним обращением к Redis (pipeline) """
+
+        keys = [RedisUserScope.replica_sticky + str(uid) for uid in uids if uid is not None]
+        rc = app_redis.redis_client
+        if rc is None or not keys:
+            return
+        try:
+            async with rc.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(key, 1, ex=settings.DB_REPLICA_STICKY_SECONDS)
+                await pipe.execute()
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка записи в Redis: {}", str(e))
+        return
+
+    async def is_sticky(self, *uids: Any) -> bool | None:
+        """ True, если кто-то из пользователей недавно изменен, None - Redis недоступен """
+
+        keys = [RedisUserScope.replica_sticky + str(uid) for uid in uids if uid is not None]
+        if not keys:
+            return False
+        rc = app_redis.redis_client
+        if rc is None:
+            return None
+        try:
+            return await rc.exists(*keys) > 0
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка чтения Redis: {}", str(e))
+            return None
+
+
+replica_sticky = ReplicaSticky()
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import math
+import socket
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis.redis import RedisUserScope
+
+
+class BloomFilter:
+    """
+    Фильтр Блума. Отрицательный ответ точный, положительный - с вероятностью ложного срабатывания error_rate.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size: int = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes: int = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        return
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevokedTokens:
+    """
+    Отозванные access токены. jti хранится в Redis (область "auth:revoked:") до истечения срока токена, в каждом
+    воркере - фильтр Блума, который периодически пересобирается из Redis. Если jti нет в фильтре, токен не отозван
+    и обращения к Redis не будет.
+    """
+
+    def __init__(self):
+        self._bloom: BloomFilter = self._new_bloom()
+        self._recent: list[str] = []
+        self.synced_at: float = 0.0
+
+    @staticmethod
+    def _new_bloom() -> BloomFilter:
+        return BloomFilter(settings.REVOKED_BLOOM_CAPACITY, settings.REVOKED_BLOOM_ERROR_RATE)
+
+    async def revoke(self, cln: Redis, jti: str, exp: int) -> None:
+        """ Отзывает токен до exp (timestamp) """
+
+        ttl = int(exp - time.time())
+        if ttl <= 0:
+            return
+
+        self._bloom.add(jti)
+        self._recent.append(jti)
+        try:
+            await cln.set(RedisUserScope.revoked + jti, 1, ex=ttl)
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка записи в Redis: {}", str(e))
+        return
+
+    async def is_revoked(self, cln: Redis, jti: str | None) -> bool:
+        if jti is None or jti not in self._bloom:
+            return False
+
+        try:
+            result = await cln.exists(RedisUserScope.revoked + jti)
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка чтения записи Redis: {}", str(e))
+            return True
+        return bool(result)
+
+    async def sync(self, cln: Redis) -> None:
+        """ Пересобирает фильтр из Redis, истекшие jti из него уходят """
+
+        bloom = self._new_bloom()
+        self._recent = []
+        prefix_len = len(RedisUserScope.revoked)
+        try:
+            async for key in cln.scan_iter(match=RedisUserScope.revoked + "*", count=1000):
+                bloom.add(key[prefix_len:])
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка синхронизации отозванных токенов из Redis: {}", str(e))
+            return
+
+        for jti in self._recent:  # отозванные в этом воркере во время сканирования
+            bloom.add(jti)
+        self._bloom = bloom
+        self.synced_at = time.monotonic()
+        return
+
+    async def run_sync(self, cln: Redis) -> None:
+        """ Фоновая синхронизация, запускается в lifespan """
+
+        while True:
+            await self.sync(cln)
+            await asyncio.sleep(settings.REVOKED_SYNC_SECONDS)
+
+
+revoked_tokens = RevokedTokens()
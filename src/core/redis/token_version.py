@@ -0,0 +1,90 @@
+import socket
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.exceptions import ConnectionError, ResponseError, TimeoutError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis.cache_decorator import app_redis
+from src.core.redis.redis import RedisUserScope
+
+
+class TokenVersions:
+    """
+    Версия токенов пользователя - счетчик в Redis (область "auth:token_version:"), в воркере кэшируется в LRU на
+    TOKEN_VERSION_LOCAL_CACHE_SIZE записей и TOKEN_VERSION_LOCAL_TTL_SECONDS. Увеличение версии делает
+    недействительными ранее выданные stateless access токены. Ключ версии хранится без TTL: при истечении ключа
+    версия "сбросилась" бы в 0, и еще действующие токены с ver > 0 получали бы отказ. При maxmemory-policy
+    volatile-lru (redis.conf) ключи без TTL не вытесняются.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize: int = maxsize
+        self._local: OrderedDict[str, tuple[float, int]] = OrderedDict()
+
+    def _get_local(self, uid: str) -> int | None:
+        item = self._local.get(uid)
+        if item is None:
+            return None
+
+        expires, version = item
+        if expires <= time.monotonic():
+            del self._local[uid]
+            return None
+
+        self._local.move_to_end(uid)
+        return version
+
+    def _set_local(self, uid: str, version: int) -> None:
+        if self.maxsize <= 0:
+            return
+        self._local[uid] = (time.monotonic() + settings.TOKEN_VERSION_LOCAL_TTL_SECONDS, version)
+        self._local.move_to_end(uid)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+        return
+
+    async def get(self, uid: Any) -> int | None:
+        """ Текущая версия (0 - версия пользователя не увеличивалась) или None, если Redis недоступен """
+
+        uid = str(uid)
+        version = self._get_local(uid)
+        if version is not None:
+            return version
+
+        rc = app_redis.redis_client
+        if rc is None:
+            return None
+        try:
+            result = await rc.get(RedisUserScope.token_version + uid)
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка чтения Redis: {}", str(e))
+            return None
+
+        version = int(result) if result is not None else 0
+        self._set_local(uid, version)
+        return version
+
+    async def bump(self, *uids: Any) -> None:
+        """ Увеличивает версии пользователей одним обращением к Redis (pipeline) """
+
+        keys = [str(uid) for uid in uids if uid is not None]
+        for uid in keys:
+            self._local.pop(uid, None)
+
+        rc = app_redis.redis_client
+        if rc is None or not keys:
+            return
+        try:
+            async with rc.pipeline(transaction=False) as pipe:
+                for uid in keys:
+                    pipe.incr(RedisUserScope.token_version + uid)
+                await pipe.execute()
+        except (ConnectionError, ResponseError, TimeoutError, socket.error) as e:
+            logger.error("Ошибка записи в Redis: {}", str(e))
+        return
+
+
+token_versions = TokenVersions(maxsize=settings.TOKEN_VERSION_LOCAL_CACHE_SIZE)
@@ -0,0 +1,64 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from src.auth_app.repositories.superuser_repository import SuperuserRepo
+from src.auth_app.schemes.user_schemes import UserServiceFieldsBulkSchema
+from src.auth_app.services.admin_actions import ServiceFieldsBulkService
+
+
+USER_ID = uuid4()
+
+
+@pytest.fixture
+def bulk_calls(monkeypatch) -> list:
+    """ Пользователь alice с USER_ID; изменения, дошедшие до bulk_update_by_admin, попадают в список """
+    calls = []
+
+    async def select_ids_by_usernames(usernames, db):
+        return {i: USER_ID for i, username in usernames.items() if username.lower() == "alice"}
+
+    async def bulk_update_by_admin(changes, db):
+        calls.append(changes)
+        return [
+            {
+                "ord": change["ord"], "id": change["id"], "username": "alice",
+                "is_active": True, "is_staff": bool(change["is_staff"]), "is_superuser": False,
+            }
+            for change in changes
+        ]
+
+    monkeypatch.setattr(SuperuserRepo, "select_ids_by_usernames", select_ids_by_usernames)
+    monkeypatch.setattr(SuperuserRepo, "bulk_update_by_admin", bulk_update_by_admin)
+    return calls
+
+
+def _update(users: list[dict]):
+    body = UserServiceFieldsBulkSchema(users=users)
+    return asyncio.run(ServiceFieldsBulkService(db=None).update_service_fields(body))
+
+
+def test_same_user_by_id_and_username_rejected(bulk_calls):
+    with pytest.raises(HTTPException) as exc:
+        _update([{"id": str(USER_ID), "is_staff": True}, {"username": "ALICE", "is_staff": False}])
+
+    assert exc.value.status_code == 400
+    assert bulk_calls == []
+
+
+def test_same_username_in_different_case_rejected(bulk_calls):
+    with pytest.raises(HTTPException) as exc:
+        _update([{"username": "alice", "is_staff": True}, {"username": "Alice", "is_active": False}])
+
+    assert exc.value.status_code == 400
+    assert bulk_calls == []
+
+
+def test_usernames_resolved_to_ids(bulk_calls):
+    response = _update([{"username": "Alice", "is_staff": True}, {"username": "bob", "is_staff": True}])
+
+    assert [change["id"] for change in bulk_calls[0]] == [USER_ID]
+    assert [result.updated for result in response.results] == [True, False]
+    assert (response.updated, response.not_found) == (1, 1)
@@ -0,0 +1,95 @@
+"""
+Импорт пользователей: проверка строк до COPY и загрузка пачки в custom_users.
+
+Загрузка (COPY во временную таблицу и вставка с отчетом о конфликтах) проверяется на PostgreSQL из
+TEST_DATABASE_URL, без него тест пропускается. Таблица создается во временной схеме внутри транзакции, которая
+затем откатывается.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import asyncpg
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from src.auth_app.commands.import_users import MAX_LENGTHS, UserImporter
+from src.auth_app.models import CustomUser
+
+
+DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+PASSWORD = "ImportPass1!"
+
+
+def _row(username: str, email: str, **names) -> dict:
+    return {"username": username, "email": email, "password": PASSWORD, **names}
+
+
+def _prepare(importer: UserImporter, batch: list[tuple[int, dict | None]]) -> list[tuple]:
+    async def prepare():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            return await importer._prepare(batch, pool)
+
+    return asyncio.run(prepare())
+
+
+def test_overlong_values_rejected_before_copy():
+    importer = UserImporter(batch_size=10, workers=1)
+    long_username = "u" * (MAX_LENGTHS["username"] + 1)
+    batch = [
+        (2, _row("valid_user", "valid@example.com", first_name="Иван")),
+        (3, _row(long_username, "long@example.com")),
+        (4, _row("long_name", "name@example.com", last_name="x" * (MAX_LENGTHS["last_name"] + 1))),
+        (5, _row("number_name", "number@example.com", first_name=42)),
+    ]
+
+    records = _prepare(importer, batch)
+
+    assert [record[0] for record in records] == [2]
+    assert all(len(record[4]) <= MAX_LENGTHS["password"] for record in records)
+    rejected = {row.line: row.reason for row in importer.stats.rejected}
+    assert sorted(rejected) == [3, 4, 5]
+    assert "username" in rejected[3] and "last_name" in rejected[4] and "first_name" in rejected[5]
+
+
+async def _load_into_temporary_schema(batch: list[tuple[int, dict | None]]) -> UserImporter:
+    importer = UserImporter(batch_size=10, workers=1)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        records = await importer._prepare(batch, pool)
+
+    connection = await asyncpg.connect(DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"))
+    try:
+        transaction = connection.transaction()
+        await transaction.start()
+        await connection.execute("CREATE SCHEMA import_test")
+        await connection.execute("SET LOCAL search_path TO import_test")
+        await connection.execute(str(CreateTable(CustomUser.__table__).compile(dialect=postgresql.dialect())))
+        await connection.execute("CREATE UNIQUE INDEX ON custom_users (lower(username))")
+        await connection.execute("CREATE UNIQUE INDEX ON custom_users (lower(email))")
+        await importer._load(connection, records)
+        await transaction.rollback()
+    finally:
+        await connection.close()
+    return importer
+
+
+@pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL не задан")
+def test_load_reports_conflicts():
+    batch = [
+        (2, _row("first_user", "first@example.com")),
+        (3, _row("First_User", "other@example.com")),
+        (4, _row("second_user", "FIRST@example.com")),
+        (5, _row("third_user", "third@example.com", first_name="x" * (MAX_LENGTHS["first_name"] + 1))),
+        (6, _row("fourth_user", "fourth@example.com")),
+    ]
+    try:
+        importer = asyncio.run(_load_into_temporary_schema(batch))
+    except OSError as exp:
+        pytest.skip(f"PostgreSQL недоступен: {exp}")
+
+    assert importer.stats.inserted == 2
+    assert {row.line: row.reason.split(":")[0] for row in importer.stats.rejected} == {
+        3: "conflict", 4: "conflict", 5: "invalid"
+    }
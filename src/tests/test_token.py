@@ -0,0 +1,26 @@
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from src.auth_app.services.token import app_token
+
+
+def _segment(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+# Заголовок с kid не строкой: PyJWT отклоняет его при чтении заголовка (InvalidTokenError, не DecodeError)
+BAD_KID_TOKEN = "JWT " + ".".join([_segment({"alg": "RS256", "typ": "JWT", "kid": 1}), _segment({"uid": "1"}), "c2ln"])
+
+
+def test_bad_kid_rejected():
+    with pytest.raises(HTTPException) as exc:
+        app_token.verify_access_token(BAD_KID_TOKEN)
+
+    assert exc.value.status_code == 403
+
+
+def test_bad_kid_in_batch_is_none():
+    assert app_token.verify_access_tokens([BAD_KID_TOKEN, "JWT not-a-token"]) == [None, None]